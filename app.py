@@ -47,6 +47,8 @@ def load_project_root():
 
 # Load project root before initializing chat_manager
 load_project_root()
+# Open the project DB now rather than inside the first tool call
+_CodebaseManager.warmup()
 
 # --- Jinja Filters & Context ---
 @app.template_filter('markdown')
@@ -91,6 +93,7 @@ def set_project_root():
         # Reset database connections to ensure new path is used
         try:
              _CodebaseManager.reset_connections()
+             _CodebaseManager.warmup()
         except Exception as e:
              print(f"Warning: Failed to reset codebase manager connections: {e}")
         
@@ -157,6 +160,7 @@ def build_project_db():
             timeout=120 # Prevent hanging indefinitely
         )
         print("DB Build Output:", result.stdout)
+        _CodebaseManager.warmup()
         return f"<span class='text-green-500'>Database built successfully! ({len(result.stdout)} chars output)</span>"
     except subprocess.TimeoutExpired:
         return f"<span class='text-red-500'>Build Timed Out (> 120s). Check server logs.</span>", 504
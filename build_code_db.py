@@ -299,9 +299,16 @@ def create_schema(cursor):
 
     # Create Indexes for performance
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_path ON files (path)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_type ON files (type)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_directories_path ON directories (path)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_py_classes_file_id ON python_classes (file_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_py_functions_file_id ON python_functions (file_id)')
+    # Composite indexes matching the python_analyzer lookups (filter + ORDER BY start_lineno)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_pf_file_class_line ON python_functions (file_id, class_id, start_lineno)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_pf_file_name ON python_functions (file_id, name)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_pf_class_line ON python_functions (class_id, start_lineno)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_pf_parent ON python_functions (parent_function_id, start_lineno)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_pc_file_name ON python_classes (file_id, name)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_html_elements_file_id ON html_elements (file_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_css_rules_file_id ON css_rules (file_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_js_constructs_file_id ON javascript_constructs (file_id)')
@@ -1546,6 +1553,9 @@ def build_project_database(root_dir=".", output_filename="project_context.db"):
             cursor.execute("INSERT INTO directory_tree (path) VALUES (?)", (path,))
 
         conn.commit()
+        # Gather planner statistics while we still hold a writable connection;
+        # the tools only ever open this file read-only.
+        cursor.execute("PRAGMA optimize")
     except sqlite3.Error as e:
         print(f"Error during database finalization: {e}")
     finally:
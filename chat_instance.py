@@ -7,6 +7,8 @@ import threading
 import os
 import time
 import traceback
+import inspect
+from functools import lru_cache
 from typing import List, Dict, Any
 
 from api_clients.base_client import BaseApiClient
@@ -14,6 +16,11 @@ from api_clients.base_client import BaseApiClient
 from tool_management import ToolManager
 from utils import send_text_to_audio_server
 
+@lru_cache(maxsize=None)
+def _accepts_instance(func) -> bool:
+    """Whether a tool function takes an 'instance' parameter; its signature is only inspected once."""
+    return 'instance' in inspect.signature(func).parameters
+
 class ChatInstance:
     def __init__(self, instance_id=None, api_client_class=None, api_key=None, name=None, caller="User"):
         self.instance_id = instance_id or f"{caller}_{str(uuid.uuid4()).split('-')[0]}"
@@ -404,9 +411,7 @@ class ChatInstance:
             # --- NEW: Context Inheritance ---
             # If the tool function accepts an 'instance' argument, pass 'self'.
             # This allows tools to know about the current chat instance (and its model/provider).
-            import inspect
-            sig = inspect.signature(func)
-            if 'instance' in sig.parameters:
+            if _accepts_instance(func):
                 # Remove 'instance' from args if the LLM hallucinated it
                 # to avoid "multiple values for keyword argument" errors
                 args.pop('instance', None)
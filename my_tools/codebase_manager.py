@@ -8,7 +8,7 @@
 
 import os
 import sqlite3
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
 class _CodebaseManager:
     _instance = None
@@ -18,6 +18,9 @@ class _CodebaseManager:
     _read_conn = None
     _write_conn = None
 
+    # Absolute DB path, resolved from CODEBASE_DB_PATH on first use and cleared by reset_connections().
+    _db_path = None
+
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super(_CodebaseManager, cls).__new__(cls)
@@ -38,12 +41,48 @@ class _CodebaseManager:
             try: cls._write_conn.close()
             except: pass
             cls._write_conn = None
+
+        cls._db_path = None
         print(f"CodebaseManager: Database connections reset. New path will be derived from CODEBASE_DB_PATH='{os.environ.get('CODEBASE_DB_PATH')}'")
 
+    @classmethod
+    def warmup(cls):
+        """
+        Opens the read-only connection ahead of the first tool call and pages in the
+        root of the files index, so an agent's first query doesn't pay the open cost.
+        Does nothing if no workspace is configured or its database hasn't been built yet.
+        """
+        if not os.environ.get("CODEBASE_DB_PATH"):
+            return
+        manager = cls()
+        if not os.path.exists(manager._get_db_path()):
+            return
+        cursor = manager._execute_read_query("SELECT path FROM files LIMIT 1")
+        if cursor:
+            cursor.fetchone()
+
     def _get_db_path(self) -> str:
-        """(Internal) Helper to consistently construct the database path."""
-        workspace_dir = os.environ.get("CODEBASE_DB_PATH", ".")
-        return os.path.abspath(os.path.join(workspace_dir, self.__class__._db_filename))
+        """(Internal) Helper to consistently construct the database path. Cached until the next reset."""
+        db_path = self.__class__._db_path
+        if db_path is None:
+            workspace_dir = os.environ.get("CODEBASE_DB_PATH", ".")
+            db_path = os.path.abspath(os.path.join(workspace_dir, self.__class__._db_filename))
+            self.__class__._db_path = db_path
+        return db_path
+
+    def _get_db_stamp(self) -> Optional[Tuple[str, int, int, int]]:
+        """
+        (Internal) Returns (db_path, mtime_ns, size, inode) for the active database, or None if it
+        cannot be stat'ed. The stamp changes on every committed write and on a project-root switch,
+        so callers can use it to key caches of query results. Size and inode catch writes that land
+        within the filesystem's mtime granularity and a DB file replaced by a rebuild.
+        """
+        db_path = self._get_db_path()
+        try:
+            st = os.stat(db_path)
+        except OSError:
+            return None
+        return db_path, st.st_mtime_ns, st.st_size, st.st_ino
 
     def _get_read_connection(self):
         """(Internal) Gets a safe, read-only database connection for SELECT queries."""
@@ -59,8 +98,13 @@ class _CodebaseManager:
         try:
             # Connect using the specific read-only URI mode
             db_uri = f"file:{db_path}?mode=ro"
-            connection = sqlite3.connect(db_uri, uri=True, check_same_thread=False)
+            # Every tool shares this connection, so keep plenty of prepared statements around.
+            connection = sqlite3.connect(db_uri, uri=True, check_same_thread=False, cached_statements=256)
             connection.row_factory = sqlite3.Row
+            # Per-connection tuning; none of these write to the database file.
+            connection.execute("PRAGMA cache_size=-20000")     # ~20 MB page cache
+            connection.execute("PRAGMA temp_store=MEMORY")     # sorts/temp b-trees stay in RAM
+            connection.execute("PRAGMA mmap_size=268435456")   # read pages via mmap, up to 256 MB
             self.__class__._read_conn = connection
             return self.__class__._read_conn
         except sqlite3.Error as e:
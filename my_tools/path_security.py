@@ -1,4 +1,5 @@
 # my_tools/path_security.py
+import functools
 import os
 
 def _get_project_root() -> str | None:
@@ -19,6 +20,16 @@ def _get_project_root() -> str | None:
 
     return absolute_workspace_path
 
+@functools.lru_cache(maxsize=8)
+def _get_safe_root(project_root: str) -> tuple[str, str]:
+    """
+    (Internal) Resolves the project root once per distinct root.
+    Returns the canonical root and the same root with a trailing separator.
+    """
+    safe_root = os.path.normcase(os.path.realpath(project_root))
+    safe_prefix = safe_root if safe_root.endswith(os.sep) else safe_root + os.sep
+    return safe_root, safe_prefix
+
 def _is_path_safe(path_to_check: str) -> bool:
     """
     Ensures the path is within the project directory defined by _get_project_root()
@@ -28,10 +39,11 @@ def _is_path_safe(path_to_check: str) -> bool:
     if not project_root:
         return False
 
-    # This logic is correct and does not need to change.
-    requested_path = os.path.realpath(os.path.abspath(path_to_check))
-    safe_root = os.path.realpath(project_root)
-    return os.path.commonpath([safe_root, requested_path]) == safe_root
+    safe_root, safe_prefix = _get_safe_root(project_root)
+    requested_path = os.path.normcase(os.path.realpath(os.path.abspath(path_to_check)))
+    # Both sides are absolute, normalized and symlink-resolved, so a plain prefix test
+    # against "<root><sep>" is equivalent to the commonpath() comparison, and much cheaper.
+    return requested_path == safe_root or requested_path.startswith(safe_prefix)
 
 # This function is no longer needed as the logic is in the codebase_manager,
 # but we can leave it in case other tools use it.
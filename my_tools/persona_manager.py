@@ -9,18 +9,18 @@ logger = logging.getLogger(__name__)
 
 # Securely import necessary helpers from other modules
 from my_tools.path_security import _get_project_root, _is_path_safe
-from my_tools.code_editor import _sync_db_after_file_creation
-from my_tools.jailed_file_manager import jailed_delete_file
 
 # --- Internal Helper Functions ---
 
+# The central persona library lives next to the application and never moves, so its
+# absolute path is resolved once at import time.
+_APP_ROOT_PERSONAS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'personas')
+
 def _get_app_root_personas_dir() -> str:
     """
     (Internal) Resolves the 'personas' directory relative to this script.
     """
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    app_root = os.path.dirname(current_dir)
-    return os.path.join(app_root, 'personas')
+    return _APP_ROOT_PERSONAS_DIR
 
 def _get_workspace_personas_dir() -> str | None:
     """
@@ -40,14 +40,16 @@ def _get_persona_path(persona_name: str) -> Dict[str, Any]:
     if not persona_name or sanitized_name != f"{persona_name}.json":
         return {"status": "error", "message": f"Invalid persona name provided: '{persona_name}'."}
 
+    # The personas dir is already absolute and the sanitized name has no separators,
+    # so the path can be assembled directly without join/abspath.
     personas_dir = _get_app_root_personas_dir()
-    full_path = os.path.abspath(os.path.join(personas_dir, sanitized_name))
+    full_path = f"{personas_dir}{os.sep}{sanitized_name}"
 
     # Security check: Ensure the path is actually inside the personas dir
-    if not full_path.startswith(os.path.abspath(personas_dir)):
+    if not full_path.startswith(personas_dir + os.sep):
         return {"status": "error", "message": "Security Error: Path is outside the allowed personas directory."}
     
-    return {"status": "success", "path": full_path, "relative_path": os.path.join('personas', sanitized_name)}
+    return {"status": "success", "path": full_path, "relative_path": f"personas{os.sep}{sanitized_name}"}
 
 def list_personas() -> str:
     """
@@ -81,39 +83,48 @@ def list_personas() -> str:
         "personas": sorted(list(all_personas))
     }, indent=2)
 
-def get_persona_details(persona_name: str) -> str:
+def _load_persona_details(persona_name: str) -> Dict[str, Any]:
     """
-    Reads the JSON configuration file for a given persona.
-    Checks the workspace first, then falls back to the central repository.
-
-    @param persona_name (string): The name of the persona to read. Required.
-    @return (string): A JSON string of the persona's configuration, or an error JSON if not found.
+    (Internal) Loads a persona's configuration, checking the workspace first and then the central repository.
+    Returns the parsed configuration, or a status/message error dict.
     """
     # 1. Try Workspace First
     workspace_dir = _get_workspace_personas_dir()
     filename = f"{persona_name}.json"
     
+    # Each location is opened directly (a missing file is just FileNotFoundError) rather
+    # than stat'ed first, and read as bytes so json decodes it in a single pass.
     if workspace_dir:
         workspace_path = os.path.join(workspace_dir, filename)
-        if os.path.exists(workspace_path):
-            try:
-                with open(workspace_path, 'r', encoding='utf-8') as f:
-                    return json.dumps(json.load(f))
-            except Exception as e:
-                logger.error(f"Error reading workspace persona: {e}")
+        try:
+            with open(workspace_path, 'rb') as f:
+                return json.loads(f.read())
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error reading workspace persona: {e}")
 
     # 2. Fallback to App Root
     app_dir = _get_app_root_personas_dir()
     app_path = os.path.join(app_dir, filename)
     
-    if os.path.exists(app_path):
-        try:
-            with open(app_path, 'r', encoding='utf-8') as f:
-                return json.dumps(json.load(f))
-        except Exception as e:
-            return json.dumps({"status": "error", "message": f"Error reading central persona: {e}"})
+    try:
+        with open(app_path, 'rb') as f:
+            return json.loads(f.read())
+    except FileNotFoundError:
+        return {"status": "error", "message": f"Persona '{persona_name}' not found."}
+    except Exception as e:
+        return {"status": "error", "message": f"Error reading central persona: {e}"}
+
+def get_persona_details(persona_name: str) -> str:
+    """
+    Reads the JSON configuration file for a given persona.
+    Checks the workspace first, then falls back to the central repository.
 
-    return json.dumps({"status": "error", "message": f"Persona '{persona_name}' not found."})
+    @param persona_name (string): The name of the persona to read. Required.
+    @return (string): A JSON string of the persona's configuration, or an error JSON if not found.
+    """
+    return json.dumps(_load_persona_details(persona_name))
 
 def deploy_agent(persona_name: str) -> str:
     """
@@ -188,8 +199,8 @@ def instantiate_persona(persona_name: str, chat_manager_instance) -> tuple:
     (Internal Engine) Creates a new chat instance from a persona file.
     This is not an LLM tool, but a helper for the Flask app.
     """
-    details_json = get_persona_details(persona_name)
-    details = json.loads(details_json)
+    # Use the parsed config directly rather than round-tripping through the tool's JSON string.
+    details = _load_persona_details(persona_name)
 
     if details.get("status") == "error":
         return None, details.get("message", "Failed to get persona details.")
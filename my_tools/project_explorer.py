@@ -1,103 +1,203 @@
 # my_tools/project_explorer.py
 
+import functools
 import json
 import os
-from typing import Optional
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
 
 from my_tools.codebase_manager import _CodebaseManager
 
-# --- Public Tool Functions ---
+# --- Serialization ---
+# Tool output is consumed by the LLM, not by humans, so responses are emitted compactly.
+# orjson is used when installed; otherwise stdlib json with compact separators.
+try:
+    import orjson
 
-def get_directory_tree() -> str:
-    """
-    (Low-Cost) Lists all files and directories in the project in a tree-like format.
-    This is useful for getting a quick, high-level overview of the entire project structure.
-    """
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, separators=(',', ':'))
+
+# --- Response Cache ---
+# The unfiltered listings and the summary are identical across many tool calls,
+# so their serialized JSON is kept here, stamped with the DB file's path, mtime, size and inode.
+# Any write to the DB (or a switch of project root) changes the stamp and forces a rebuild.
+_RESPONSE_CACHE: Dict[str, Tuple[Tuple[str, int, int, int], str]] = {}
+
+def _cached_response(cache_key: str, build_result: Callable[[_CodebaseManager], Dict[str, Any]]) -> str:
+    """(Internal) Serves a serialized tool response from the cache, rebuilding it when the DB has changed."""
     manager = _CodebaseManager()
-    query = """
-        SELECT path FROM files
-        UNION
-        SELECT path FROM directories
-        ORDER BY path ASC;
-    """
-    cursor = manager._execute_read_query(query)
+    stamp = manager._get_db_stamp()
+    cached = _RESPONSE_CACHE.get(cache_key)
+    if stamp is not None and cached is not None and cached[0] == stamp:
+        return cached[1]
 
-    if cursor:
-        tree = [row['path'] for row in cursor.fetchall()]
-        result_dict = {"directory_tree": tree, "status": "success"}
-    else:
-        result_dict = {"error": "Could not query directory tree from database.", "status": "error_db_query"}
+    result_dict = build_result(manager)
+    response = _dumps(result_dict)
+    # Only successful results are cached; errors are retried on the next call.
+    if stamp is not None and result_dict.get("status") == "success":
+        _RESPONSE_CACHE[cache_key] = (stamp, response)
+    return response
 
-    return json.dumps(result_dict, indent=2)
+# --- SQL ---
+# Kept as module constants so every call hands sqlite3 the identical string and hits
+# the connection's prepared-statement cache instead of re-compiling the SQL.
 
-def list_files(directory_path: Optional[str] = None) -> str:
+# Directory paths always carry a trailing '/' and file paths never do, so the two
+# sets are disjoint and UNION ALL can skip the de-duplication pass.
+_DIRECTORY_TREE_QUERY = """
+    SELECT path FROM files
+    UNION ALL
+    SELECT path FROM directories
+    ORDER BY path ASC;
+"""
+
+_LIST_FILES_QUERY = "SELECT path FROM files ORDER BY path ASC"
+
+# The directory prefix is matched as a half-open range so SQLite can walk idx_files_path.
+# Unlike LIKE, this is case-sensitive and treats '_' and '%' literally.
+_LIST_FILES_IN_DIR_QUERY = "SELECT path FROM files WHERE path >= ? AND path < ? ORDER BY path ASC"
+
+# Distinct first path segments of every file that sits inside a directory.
+_TOP_LEVEL_DIRS_QUERY = """
+    SELECT DISTINCT substr(path, 1, instr(path, '/') - 1)
+    FROM files
+    WHERE instr(path, '/') > 0;
+"""
+
+# One grouped pass over the table; the per-type columns are pivoted in Python.
+_PROJECT_SUMMARY_QUERY = """
+    SELECT type, COUNT(*) AS file_count, SUM(COALESCE(end_lineno, 0)) AS line_count
+    FROM files
+    GROUP BY type;
+"""
+
+# --- Helper Functions (Business Logic) ---
+
+# Maps a `files.type` value to its counter in the project summary (NULL types count as "other").
+_SUMMARY_TYPE_COLUMNS = {
+    "python": "python_files",
+    "html": "html_files",
+    "css": "css_files",
+    "javascript": "javascript_files",
+    "json": "json_files",
+    "text": "text_files",
+    None: "other_files",
+}
+
+def _helper_get_directory_tree(manager: _CodebaseManager) -> Dict[str, Any]:
+    """Helper to retrieve every file and directory path in the project."""
+    cursor = manager._execute_read_query(_DIRECTORY_TREE_QUERY)
+
+    if cursor:
+        # Plain tuples are enough for a single column; skip the sqlite3.Row wrapper.
+        cursor.row_factory = None
+        tree = [row[0] for row in cursor]
+        return {"directory_tree": tree, "status": "success"}
+    return {"error": "Could not query directory tree from database.", "status": "error_db_query"}
+
+@functools.lru_cache(maxsize=128)
+def _normalize_dir_path(directory_path: str) -> str:
     """
-    (Low-Cost) Lists all files, optionally filtering by a specific subdirectory. Returns a list of project-relative paths (e.g., 'folder/file.txt').
-    
-    @param directory_path (string): The project-relative directory to filter by (e.g., "src/"). If omitted, all files in the project are listed.
+    (Internal) Normalizes a directory filter for prefix matching (e.g., remove leading ./, ensure trailing /).
+    Cached because agents tend to list the same few directories over and over.
     """
-    manager = _CodebaseManager()
+    norm_dir_path = directory_path.replace("\\", "/").strip("./")
+    if norm_dir_path and not norm_dir_path.endswith('/'):
+        norm_dir_path += '/'
+    return norm_dir_path
 
-    # Base query for all files
-    query = "SELECT path FROM files"
-    query_params = []
+# (db stamp, top-level directory names) used by list_files to reject unknown prefixes
+# without querying. Rebuilt whenever the DB stamp changes.
+_top_level_dirs: Optional[Tuple[Tuple[str, int, int, int], FrozenSet[str]]] = None
 
-    # Filtering logic if a directory_path is provided
-    if directory_path:
-        # Normalize path for consistent matching (e.g., remove leading ./, ensure trailing /)
-        norm_dir_path = directory_path.replace("\\", "/").strip("./")
-        if norm_dir_path and not norm_dir_path.endswith('/'):
-            norm_dir_path += '/'
+def _get_top_level_dirs(manager: _CodebaseManager) -> Optional[FrozenSet[str]]:
+    """(Internal) Returns the set of top-level directories containing files, or None if unavailable."""
+    global _top_level_dirs
+    stamp = manager._get_db_stamp()
+    if stamp is None:
+        return None
+    if _top_level_dirs is not None and _top_level_dirs[0] == stamp:
+        return _top_level_dirs[1]
 
-        # Add a WHERE clause to filter by the normalized path prefix
-        if norm_dir_path:
-            query += " WHERE path LIKE ?"
-            query_params.append(f"{norm_dir_path}%")
+    cursor = manager._execute_read_query(_TOP_LEVEL_DIRS_QUERY)
+    if not cursor:
+        return None
+    cursor.row_factory = None
+    dirs = frozenset(row[0] for row in cursor)
+    _top_level_dirs = (stamp, dirs)
+    return dirs
 
-    query += " ORDER BY path ASC"
-    cursor = manager._execute_read_query(query, tuple(query_params))
+def _helper_list_files(manager: _CodebaseManager, directory_path: Optional[str]) -> Dict[str, Any]:
+    """Helper to retrieve file paths, optionally filtered by a directory prefix."""
+    norm_dir_path = _normalize_dir_path(directory_path) if directory_path else ""
 
-    if cursor:
-        files = [row['path'] for row in cursor.fetchall()]
-        result_dict = {"directory_path": directory_path, "files": files, "status": "success"}
+    # Filtering logic if a directory_path is provided
+    if norm_dir_path:
+        # Agents often guess at directory names; answer those without touching the files index.
+        top_level_dirs = _get_top_level_dirs(manager)
+        if top_level_dirs is not None and norm_dir_path.split('/', 1)[0] not in top_level_dirs:
+            return {"directory_path": directory_path, "files": [], "status": "success"}
+        # ('0' is the character right after '/', so "dir0" bounds every "dir/..." path.)
+        cursor = manager._execute_read_query(_LIST_FILES_IN_DIR_QUERY, (norm_dir_path, norm_dir_path[:-1] + '0'))
     else:
-        result_dict = {"error": "Could not query file list from database.", "status": "error_db_query"}
+        cursor = manager._execute_read_query(_LIST_FILES_QUERY)
 
-    return json.dumps(result_dict, indent=2)
+    if cursor:
+        cursor.row_factory = None
+        files = [row[0] for row in cursor]
+        return {"directory_path": directory_path, "files": files, "status": "success"}
+    return {"error": "Could not query file list from database.", "status": "error_db_query"}
 
-def get_project_summary() -> str:
-    """
-    (Low-Cost) Provides a high-level summary of the project, including file counts by type and total lines of code.
+def _helper_get_project_summary(manager: _CodebaseManager) -> Dict[str, Any]:
+    """Helper to aggregate file counts by type and total lines of code."""
+    cursor = manager._execute_read_query(_PROJECT_SUMMARY_QUERY)
+
+    if not cursor:
+        return {"error": "Failed to query project summary.", "status": "error_db_query"}
+
+    rows = cursor.fetchall()
+    # This case handles an empty but valid database table.
+    if not rows:
+        return {"summary": {}, "status": "success", "message": "Project database is empty."}
+
+    summary_data = {"total_files": 0, "total_lines": 0}
+    summary_data.update(dict.fromkeys(_SUMMARY_TYPE_COLUMNS.values(), 0))
+    for file_type, file_count, line_count in rows:
+        summary_data["total_files"] += file_count
+        summary_data["total_lines"] += line_count
+        column = _SUMMARY_TYPE_COLUMNS.get(file_type)
+        if column:
+            summary_data[column] += file_count
+    return {"summary": summary_data, "status": "success"}
+
+# --- Public Tool Functions ---
+
+def get_directory_tree() -> str:
     """
-    manager = _CodebaseManager()
-    query = """
-        SELECT
-            COUNT(*) as total_files,
-            SUM(CASE WHEN end_lineno IS NOT NULL THEN end_lineno ELSE 0 END) as total_lines,
-            SUM(CASE WHEN type = 'python' THEN 1 ELSE 0 END) as python_files,
-            SUM(CASE WHEN type = 'html' THEN 1 ELSE 0 END) as html_files,
-            SUM(CASE WHEN type = 'css' THEN 1 ELSE 0 END) as css_files,
-            SUM(CASE WHEN type = 'javascript' THEN 1 ELSE 0 END) as javascript_files,
-            SUM(CASE WHEN type = 'json' THEN 1 ELSE 0 END) as json_files,
-            SUM(CASE WHEN type = 'text' THEN 1 ELSE 0 END) as text_files,
-            SUM(CASE WHEN type IS NULL THEN 1 ELSE 0 END) as other_files
-        FROM files;
+    (Low-Cost) Lists all files and directories in the project in a tree-like format.
+    This is useful for getting a quick, high-level overview of the entire project structure.
     """
-    cursor = manager._execute_read_query(query)
+    return _cached_response("get_directory_tree", _helper_get_directory_tree)
 
-    if not cursor:
-        return json.dumps({"error": "Failed to query project summary.", "status": "error_db_query"}, indent=2)
+def list_files(directory_path: Optional[str] = None) -> str:
+    """
+    (Low-Cost) Lists all files, optionally filtering by a specific subdirectory. Returns a list of project-relative paths (e.g., 'folder/file.txt').
+    
+    @param directory_path (string): The project-relative directory to filter by (e.g., "src/"). If omitted, all files in the project are listed.
+    """
+    if directory_path is None:
+        return _cached_response("list_files", lambda manager: _helper_list_files(manager, None))
 
-    row = cursor.fetchone()
-    # Ensure row is not None (e.g., for an empty table) before converting to dict
-    if row:
-        summary_data = dict(row)
-        result_dict = {"summary": summary_data, "status": "success"}
-    else:
-        # This case handles an empty but valid database table.
-        result_dict = {"summary": {}, "status": "success", "message": "Project database is empty."}
+    manager = _CodebaseManager()
+    return _dumps(_helper_list_files(manager, directory_path))
 
-    return json.dumps(result_dict, indent=2)
+def get_project_summary() -> str:
+    """
+    (Low-Cost) Provides a high-level summary of the project, including file counts by type and total lines of code.
+    """
+    return _cached_response("get_project_summary", _helper_get_project_summary)
 
 def get_current_project_root() -> str:
     """
@@ -106,7 +206,6 @@ def get_current_project_root() -> str:
     """
     # This function does not use the database and is unchanged.
     from my_tools.path_security import _get_project_root
-    import json
     try:
         root_path = _get_project_root()
         return json.dumps({"status": "success", "project_root": root_path})
@@ -121,7 +220,6 @@ def list_available_tools() -> str:
     """
     import inspect
     import importlib
-    import os
     
     tools_list = []
     directory = "my_tools"
@@ -149,11 +247,11 @@ def list_available_tools() -> str:
                 # Skip modules that fail to import (e.g. missing dependencies)
                 continue
 
-    return json.dumps({
+    return _dumps({
         "status": "success",
         "total_tools": len(tools_list),
         "available_tools": tools_list
-    }, indent=2)
+    })
 
 if __name__ == '__main__':
     print("--- Testing ProjectExplorer Tool ---")
@@ -169,7 +267,7 @@ if __name__ == '__main__':
         print(f"Using database found at: '{os.path.abspath(db_path)}'")
 
         print("\n--- Test Call 1: get_project_summary() ---")
-        print(get_project_summary())
+        print(json.dumps(json.loads(get_project_summary()), indent=2))
 
         print("\n--- Test Call 2: get_directory_tree() ---")
         # Keep the output brief for testing
@@ -188,7 +286,7 @@ if __name__ == '__main__':
         print(json.dumps(list_all_result, indent=2))
 
         print("\n--- Test Call 4: list_files(directory_path='my_tools') ---")
-        print(list_files(directory_path="my_tools"))
+        print(json.dumps(json.loads(list_files(directory_path="my_tools")), indent=2))
 
         print("\n--- Test Call 5: list_files(directory_path='non_existent_dir/') ---")
-        print(list_files(directory_path="non_existent_dir/"))
+        print(json.dumps(json.loads(list_files(directory_path="non_existent_dir/")), indent=2))
@@ -1,19 +1,134 @@
 # my_tools/python_analyzer.py
 
+import functools
 import json
-from typing import Dict, Any, Optional
+from itertools import groupby
+from typing import Dict, Any, List, Optional, Tuple
 
 from my_tools.codebase_manager import _CodebaseManager
 
+# orjson is used when installed; otherwise stdlib json with the same 2-space indent.
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
+# --- Input Validation ---
+# Paths longer than this can't name a file in the index, so they are rejected before any DB work.
+_MAX_FILE_PATH_LENGTH = 4096
+# Caps get_python_functions_details so its IN (...) list stays well under SQLite's bound-parameter limit.
+_MAX_BATCH_FUNCTION_NAMES = 200
+
+# Serialized once at import; the guard paths below hand back the same string every time.
+_ERR_MISSING_FILE_PATH = _dumps({"error": "Missing 'file_path' parameter.", "status": "error_missing_param"})
+_ERR_MISSING_CLASS_PARAMS = _dumps({"error": "Missing 'file_path' or 'class_name' parameter.", "status": "error_missing_param"})
+_ERR_MISSING_FUNCTION_PARAMS = _dumps({"error": "Missing 'file_path' or 'function_name' parameter.", "status": "error_missing_param"})
+_ERR_MISSING_FUNCTIONS_PARAMS = _dumps({"error": "Missing 'file_path' or 'function_names' parameter.", "status": "error_missing_param"})
+_ERR_INVALID_FUNCTION_NAMES = _dumps({"error": f"Invalid 'function_names' parameter: expected a list of at most {_MAX_BATCH_FUNCTION_NAMES} function name strings.", "status": "error_invalid_param"})
+_ERR_INVALID_FILE_PATH = _dumps({"error": f"Invalid 'file_path' parameter: expected a path string of at most {_MAX_FILE_PATH_LENGTH} characters.", "status": "error_invalid_param"})
+
+def _check_file_path(file_path: Any) -> Optional[str]:
+    """(Internal) Returns a preserialized error response if file_path is unusable, otherwise None."""
+    if not file_path:
+        return _ERR_MISSING_FILE_PATH
+    if not isinstance(file_path, str) or len(file_path) > _MAX_FILE_PATH_LENGTH:
+        return _ERR_INVALID_FILE_PATH
+    return None
+
+@functools.lru_cache(maxsize=1)
+def _get_manager() -> _CodebaseManager:
+    """
+    (Internal) Returns the shared _CodebaseManager, constructed once for this module.
+    Connections live on the class, so reset_connections() still applies to this instance.
+    """
+    return _CodebaseManager()
+
+# --- SQL ---
+# Kept as module constants so every call hands sqlite3 the identical string and hits
+# the connection's prepared-statement cache instead of re-compiling the SQL.
+
+_FILE_ID_QUERY = "SELECT id FROM files WHERE path = ?"
+
+_LIST_CLASSES_QUERY = "SELECT name, start_lineno, end_lineno FROM python_classes WHERE file_id = ? ORDER BY start_lineno"
+
+_LIST_FUNCTIONS_QUERY = """
+    SELECT
+        pf.name,
+        pf.signature,
+        pc.name as class_name
+    FROM python_functions pf
+    LEFT JOIN python_classes pc ON pf.class_id = pc.id
+    WHERE pf.file_id = ?
+    ORDER BY pf.start_lineno
+"""
+
+# Class row and its methods in one round-trip; each row carries the class columns
+# plus one method (or NULLs when the class has no methods).
+_CLASS_DETAILS_QUERY = """
+    SELECT
+        c.id, c.name, c.docstring, c.start_lineno, c.end_lineno,
+        f.name AS m_name, f.signature AS m_signature, f.docstring AS m_docstring,
+        f.start_lineno AS m_start_lineno, f.end_lineno AS m_end_lineno
+    FROM python_classes c
+    LEFT JOIN python_functions f ON f.class_id = c.id
+    WHERE c.file_id = ? AND c.name = ?
+    ORDER BY c.id, f.start_lineno
+"""
+
+# Matching functions and their directly nested functions in one round-trip; a function
+# spans one row per nested child (or a single row of NULLs when it has none).
+_FUNCTION_DETAILS_SELECT = """
+    SELECT
+        f.id, f.name, f.signature, f.docstring, f.start_lineno, f.end_lineno, c.name AS class_name,
+        n.name AS n_name, n.signature AS n_signature, n.start_lineno AS n_start_lineno, n.end_lineno AS n_end_lineno
+    FROM python_functions f
+    LEFT JOIN python_classes c ON f.class_id = c.id
+    LEFT JOIN python_functions n ON n.parent_function_id = f.id
+"""
+
+_FUNCTION_DETAILS_QUERY = _FUNCTION_DETAILS_SELECT + """
+    WHERE f.file_id = ? AND f.name = ?
+    ORDER BY f.id, n.start_lineno
+"""
+
+# Batch form; '{placeholders}' is filled with one '?' per requested name.
+_FUNCTIONS_DETAILS_QUERY_TEMPLATE = _FUNCTION_DETAILS_SELECT + """
+    WHERE f.file_id = ? AND f.name IN ({placeholders})
+    ORDER BY f.id, n.start_lineno
+"""
+
 # --- Helper Functions (Business Logic) ---
 
+@functools.lru_cache(maxsize=1024)
+def _lookup_file_id(manager: _CodebaseManager, db_stamp: Tuple[str, int, int, int], file_path: str) -> Optional[int]:
+    """
+    (Internal) Cached path -> id lookup. Keyed on the DB stamp, so any write to the DB invalidates it.
+    Raises LookupError when the query itself fails so that failures are never cached.
+    """
+    cursor = manager._execute_read_query(_FILE_ID_QUERY, (file_path,))
+    if not cursor:
+        raise LookupError(file_path)
+    row = cursor.fetchone()
+    return row['id'] if row else None
+
 def _helper_get_file_id(manager: _CodebaseManager, file_path: str) -> Optional[int]:
     """Given a file path, queries the DB for its unique ID."""
-    cursor = manager._execute_read_query("SELECT id FROM files WHERE path = ?", (file_path,))
-    if cursor:
-        row = cursor.fetchone()
-        return row['id'] if row else None
-    return None
+    db_stamp = manager._get_db_stamp()
+    if db_stamp is None:
+        # No DB file to stamp; let the uncached query report the problem.
+        cursor = manager._execute_read_query(_FILE_ID_QUERY, (file_path,))
+        if cursor:
+            row = cursor.fetchone()
+            return row['id'] if row else None
+        return None
+    try:
+        return _lookup_file_id(manager, db_stamp, file_path)
+    except LookupError:
+        return None
 
 def _helper_list_python_classes(manager: _CodebaseManager, file_path: str) -> Dict[str, Any]:
     """Helper to retrieve a list of classes for a given file."""
@@ -21,12 +136,12 @@ def _helper_list_python_classes(manager: _CodebaseManager, file_path: str) -> Di
     if file_id is None:
         return {"file_path": file_path, "error": "File not found or DB connection failed.", "status": "error_not_found"}
 
-    query = "SELECT name, start_lineno, end_lineno FROM python_classes WHERE file_id = ? ORDER BY start_lineno"
-    cursor = manager._execute_read_query(query, (file_id,))
+    cursor = manager._execute_read_query(_LIST_CLASSES_QUERY, (file_id,))
     if not cursor:
         return {"error": "DB query failed for classes.", "status": "error_db_query"}
 
-    classes = [dict(row) for row in cursor.fetchall()]
+    # Columns are fixed by the query above, so index positionally rather than copying each Row.
+    classes = [{"name": r[0], "start_lineno": r[1], "end_lineno": r[2]} for r in cursor]
     return {"file_path": file_path, "classes": classes, "status": "success"}
 
 def _helper_list_python_functions(manager: _CodebaseManager, file_path: str) -> Dict[str, Any]:
@@ -35,28 +150,17 @@ def _helper_list_python_functions(manager: _CodebaseManager, file_path: str) ->
     if file_id is None:
         return {"file_path": file_path, "error": "File not found or DB connection failed.", "status": "error_not_found"}
 
-    query = """
-        SELECT 
-            pf.name, 
-            pf.signature, 
-            pc.name as class_name 
-        FROM python_functions pf
-        LEFT JOIN python_classes pc ON pf.class_id = pc.id
-        WHERE pf.file_id = ? 
-        ORDER BY pf.start_lineno
-    """
-    cursor = manager._execute_read_query(query, (file_id,))
+    cursor = manager._execute_read_query(_LIST_FUNCTIONS_QUERY, (file_id,))
     
     functions = []
     if cursor:
-        for row in cursor.fetchall():
-            # Format: "my_function" OR "MyClass.my_method"
-            full_name = f"{row['class_name']}.{row['name']}" if row['class_name'] else row['name']
-            functions.append({
-                "name": full_name,
-                "signature": row['signature']
-            })
-            
+        # Format: "my_function" OR "MyClass.my_method"; columns are (name, signature, class_name).
+        functions = [
+            {"name": f"{r[2]}.{r[0]}" if r[2] else r[0], "signature": r[1]}
+            for r in cursor
+        ]
+
+
     return {"file_path": file_path, "functions": functions, "status": "success"}
 
 def _helper_get_python_class_details(manager: _CodebaseManager, file_path: str, class_name: str) -> Dict[str, Any]:
@@ -65,67 +169,108 @@ def _helper_get_python_class_details(manager: _CodebaseManager, file_path: str,
     if file_id is None:
         return {"file_path": file_path, "error": "File not found or DB connection failed.", "status": "error_not_found"}
 
-    class_cursor = manager._execute_read_query(
-        "SELECT id, name, docstring, start_lineno, end_lineno FROM python_classes WHERE file_id = ? AND name = ?", (file_id, class_name)
-    )
-    if not class_cursor:
+    cursor = manager._execute_read_query(_CLASS_DETAILS_QUERY, (file_id, class_name))
+    if not cursor:
         return {"error": "DB query failed for class details.", "status": "error_db_query"}
-    class_data = class_cursor.fetchone()
+    rows = cursor.fetchall()
 
-    if not class_data:
+    if not rows:
         return {"file_path": file_path, "class_name": class_name, "error": "Class not found in file.", "status": "error_not_found"}
 
-    class_details = dict(class_data)
-    class_id = class_details.pop('id')
-
-    methods_cursor = manager._execute_read_query(
-        "SELECT name, signature, docstring, start_lineno, end_lineno FROM python_functions WHERE class_id = ? ORDER BY start_lineno", (class_id,)
-    )
-    if methods_cursor:
-        class_details['methods'] = [dict(row) for row in methods_cursor.fetchall()]
-    else:
-        class_details['methods'] = [] # Ensure methods key exists
+    # If the name is defined more than once, report the first definition, as before.
+    first = rows[0]
+    class_id = first['id']
+    class_details = {
+        "name": first['name'],
+        "docstring": first['docstring'],
+        "start_lineno": first['start_lineno'],
+        "end_lineno": first['end_lineno'],
+        "methods": [
+            {
+                "name": row['m_name'],
+                "signature": row['m_signature'],
+                "docstring": row['m_docstring'],
+                "start_lineno": row['m_start_lineno'],
+                "end_lineno": row['m_end_lineno'],
+            }
+            for row in rows
+            if row['id'] == class_id and row['m_name'] is not None
+        ],
+    }
 
     return {"file_path": file_path, "class_name": class_name, "details": class_details, "status": "success"}
 
+def _build_function_details(rows) -> List[Dict[str, Any]]:
+    """
+    (Internal) Turns function-details rows (ordered by function id) into one dict per function,
+    each carrying its directly nested functions.
+    """
+    results = []
+    for _, func_rows in groupby(rows, key=lambda row: row['id']):
+        func_rows = list(func_rows)
+        first = func_rows[0]
+        results.append({
+            "name": first['name'],
+            "signature": first['signature'],
+            "docstring": first['docstring'],
+            "start_lineno": first['start_lineno'],
+            "end_lineno": first['end_lineno'],
+            "class_name": first['class_name'],
+            "nested_functions": [
+                {
+                    "name": row['n_name'],
+                    "signature": row['n_signature'],
+                    "start_lineno": row['n_start_lineno'],
+                    "end_lineno": row['n_end_lineno'],
+                }
+                for row in func_rows
+                if row['n_name'] is not None
+            ],
+        })
+    return results
+
 def _helper_get_python_function_details(manager: _CodebaseManager, file_path: str, function_name: str) -> Dict[str, Any]:
     """Helper to retrieve detailed information about a specific function."""
     file_id = _helper_get_file_id(manager, file_path)
     if file_id is None:
         return {"file_path": file_path, "error": "File not found or DB connection failed.", "status": "error_not_found"}
 
-    query = """
-        SELECT f.id, f.name, f.signature, f.docstring, f.start_lineno, f.end_lineno, c.name as class_name
-        FROM python_functions f
-        LEFT JOIN python_classes c ON f.class_id = c.id
-        WHERE f.file_id = ? AND f.name = ?
-    """
-    cursor = manager._execute_read_query(query, (file_id, function_name))
+    cursor = manager._execute_read_query(_FUNCTION_DETAILS_QUERY, (file_id, function_name))
     if not cursor:
         return {"error": "DB query failed for function details.", "status": "error_db_query"}
 
-    func_data = cursor.fetchall()
-    if not func_data:
+    results = _build_function_details(cursor)
+
+    if not results:
         return {"file_path": file_path, "function_name": function_name, "error": "Function not found in file.", "status": "error_not_found"}
 
-    results = []
-    for row in func_data:
-        func_details = dict(row)
-        function_id = func_details.pop('id')
+    return {"file_path": file_path, "function_name": function_name, "details": results, "status": "success"}
+
+def _helper_get_python_functions_details(manager: _CodebaseManager, file_path: str, function_names: List[str]) -> Dict[str, Any]:
+    """Helper to retrieve detailed information about several functions of one file in a single query."""
+    file_id = _helper_get_file_id(manager, file_path)
+    if file_id is None:
+        return {"file_path": file_path, "error": "File not found or DB connection failed.", "status": "error_not_found"}
 
-        nested_functions_cursor = manager._execute_read_query(
-            "SELECT name, signature, start_lineno, end_lineno FROM python_functions WHERE parent_function_id = ? ORDER BY start_lineno",
-            (function_id,)
-        )
+    query = _FUNCTIONS_DETAILS_QUERY_TEMPLATE.format(placeholders=",".join("?" * len(function_names)))
+    cursor = manager._execute_read_query(query, (file_id, *function_names))
+    if not cursor:
+        return {"error": "DB query failed for function details.", "status": "error_db_query"}
 
-        nested_functions_list = []
-        if nested_functions_cursor:
-            nested_functions_list = [dict(r) for r in nested_functions_cursor.fetchall()]
+    functions: Dict[str, List[Dict[str, Any]]] = {name: [] for name in function_names}
+    for details in _build_function_details(cursor):
+        functions[details['name']].append(details)
 
-        func_details['nested_functions'] = nested_functions_list
-        results.append(func_details)
+    not_found = [name for name, details in functions.items() if not details]
+    if len(not_found) == len(function_names):
+        return {"file_path": file_path, "function_names": function_names, "error": "None of the functions were found in file.", "status": "error_not_found"}
 
-    return {"file_path": file_path, "function_name": function_name, "details": results, "status": "success"}
+    return {
+        "file_path": file_path,
+        "functions": {name: details for name, details in functions.items() if details},
+        "not_found": not_found,
+        "status": "success",
+    }
 
 # --- Public Tool Functions ---
 
@@ -134,22 +279,24 @@ def list_python_classes(file_path: str) -> str:
     (Low-Cost) Lists all classes declared in a given Python file.
     @param file_path (string): The path to the Python file to analyze. REQUIRED.
     """
-    if not file_path:
-        return json.dumps({"error": "Missing 'file_path' parameter.", "status": "error_missing_param"}, indent=2)
-    manager = _CodebaseManager()
+    error = _check_file_path(file_path)
+    if error:
+        return error
+    manager = _get_manager()
     result_dict = _helper_list_python_classes(manager, file_path)
-    return json.dumps(result_dict, indent=2)
+    return _dumps(result_dict)
 
 def list_python_functions(file_path: str) -> str:
     """
     (Low-Cost) Lists all top-level functions declared in a given Python file (methods inside classes are not included).
     @param file_path (string): The path to the Python file to analyze. REQUIRED.
     """
-    if not file_path:
-        return json.dumps({"error": "Missing 'file_path' parameter.", "status": "error_missing_param"}, indent=2)
-    manager = _CodebaseManager()
+    error = _check_file_path(file_path)
+    if error:
+        return error
+    manager = _get_manager()
     result_dict = _helper_list_python_functions(manager, file_path)
-    return json.dumps(result_dict, indent=2)
+    return _dumps(result_dict)
 
 def get_python_class_details(file_path: str, class_name: str) -> str:
     """
@@ -158,10 +305,13 @@ def get_python_class_details(file_path: str, class_name: str) -> str:
     @param class_name (string): The name of the class to retrieve details for. REQUIRED.
     """
     if not file_path or not class_name:
-        return json.dumps({"error": "Missing 'file_path' or 'class_name' parameter.", "status": "error_missing_param"}, indent=2)
-    manager = _CodebaseManager()
+        return _ERR_MISSING_CLASS_PARAMS
+    error = _check_file_path(file_path)
+    if error:
+        return error
+    manager = _get_manager()
     result_dict = _helper_get_python_class_details(manager, file_path, class_name)
-    return json.dumps(result_dict, indent=2)
+    return _dumps(result_dict)
 
 def get_python_function_details(file_path: str, function_name: str) -> str:
     """
@@ -171,10 +321,37 @@ def get_python_function_details(file_path: str, function_name: str) -> str:
     @param function_name (string): The name of the function to retrieve details for. REQUIRED.
     """
     if not file_path or not function_name:
-        return json.dumps({"error": "Missing 'file_path' or 'function_name' parameter.", "status": "error_missing_param"}, indent=2)
-    manager = _CodebaseManager()
+        return _ERR_MISSING_FUNCTION_PARAMS
+    error = _check_file_path(file_path)
+    if error:
+        return error
+    manager = _get_manager()
     result_dict = _helper_get_python_function_details(manager, file_path, function_name)
-    return json.dumps(result_dict, indent=2)
+    return _dumps(result_dict)
+
+def get_python_functions_details(file_path: str, function_names: list) -> str:
+    """
+    (Medium-Cost) Retrieves detailed information about several functions in one Python file at once; prefer this over repeated get_python_function_details calls.
+    Results are grouped by function name; names that aren't defined in the file are listed under 'not_found'.
+    @param file_path (string): The path to the Python file where the functions are defined. REQUIRED.
+    @param function_names (List[string]): The names of the functions or methods to retrieve details for (e.g., ["main", "_helper"]). REQUIRED.
+    """
+    # Also accept "a, b, c", which models sometimes send in place of a list.
+    if isinstance(function_names, str):
+        function_names = [name.strip() for name in function_names.split(",")]
+    if not file_path or not function_names:
+        return _ERR_MISSING_FUNCTIONS_PARAMS
+    error = _check_file_path(file_path)
+    if error:
+        return error
+    if not isinstance(function_names, (list, tuple)) or not all(isinstance(name, str) and name for name in function_names):
+        return _ERR_INVALID_FUNCTION_NAMES
+    function_names = list(dict.fromkeys(function_names))  # de-duplicate, keeping the caller's order
+    if len(function_names) > _MAX_BATCH_FUNCTION_NAMES:
+        return _ERR_INVALID_FUNCTION_NAMES
+    manager = _get_manager()
+    result_dict = _helper_get_python_functions_details(manager, file_path, function_names)
+    return _dumps(result_dict)
 
 
 if __name__ == '__main__':
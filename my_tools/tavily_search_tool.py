@@ -2,35 +2,136 @@
 import requests
 import json
 import os
-import traceback
-from typing import List, Optional, Union, Dict, Any
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Union, Dict, Any, Tuple
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def tavily_search(
-    query: str,
-    search_depth: str = "basic",
-    include_answer: bool = True,
-    max_results: int = 3,
-    include_domains: Optional[List[str]] = None,
-    exclude_domains: Optional[List[str]] = None,
-    topic: str = "general",
-    include_raw_content: bool = False
-) -> str:
+# orjson when installed; otherwise stdlib json. Both produce/consume UTF-8 bytes for the wire.
+try:
+    import orjson
+
+    _encode_body = orjson.dumps
+    _decode_body = orjson.loads
+except ImportError:
+    def _encode_body(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    _decode_body = json.loads
+
+# One keep-alive session for all searches, so only the first call pays for the TCP/TLS handshake.
+# Retry covers dropped or refused connections; POSTs are not re-sent after the server has answered.
+_TAVILY_SESSION = requests.Session()
+_TAVILY_SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=2, backoff_factor=0.1)),
+)
+
+_TAVILY_URL = "https://api.tavily.com/search"
+
+# The api_key travels in the JSON payload (Tavily also accepts "Authorization: Bearer <key>").
+_TAVILY_HEADERS = {"Content-Type": "application/json"}
+
+_SUCCESS_STATUS_MEMBER = b'"status":"success"'
+
+
+def _with_success_status(raw: bytes) -> str:
     """
-    Performs a search using the Tavily Search API and returns structured results.
+    (Internal) Adds "status": "success" to Tavily's JSON object response.
+    The member is spliced into the raw bytes, so the (often large) body is neither parsed nor re-encoded.
+    Anything that isn't a plain JSON object falls back to a decode/re-encode.
+    """
+    body = raw.strip()
+    if body.startswith(b"{") and body.endswith(b"}"):
+        if not body[1:-1].strip():
+            return "{" + _SUCCESS_STATUS_MEMBER.decode() + "}"
+        return (body[:-1] + b"," + _SUCCESS_STATUS_MEMBER + b"}").decode("utf-8")
+    search_data = _decode_body(raw)
+    search_data["status"] = "success"
+    return json.dumps(search_data)
+
+# --- Response Cache ---
+# Agents often repeat a search within a session; identical searches inside the TTL are served
+# from memory instead of spending another API call. Only successful responses are stored.
+_CACHE_MAX_ENTRIES = 128
+_CACHE_TTL_SECONDS = 300.0
+_RESPONSE_CACHE: "OrderedDict[Tuple, Tuple[float, str]]" = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def _cache_key(payload: Dict[str, Any]) -> Optional[Tuple]:
+    """(Internal) Builds the cache key from a validated payload; None if it can't be hashed."""
+    key = (
+        " ".join(payload["query"].split()).lower(),
+        payload["search_depth"],
+        payload["include_answer"],
+        payload["max_results"],
+        payload["topic"],
+        payload["include_raw_content"],
+        tuple(payload.get("include_domains", ())),
+        tuple(payload.get("exclude_domains", ())),
+    )
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _cache_get(key: Optional[Tuple]) -> Optional[str]:
+    """(Internal) Returns a fresh cached response for key, or None."""
+    if key is None:
+        return None
+    with _RESPONSE_CACHE_LOCK:
+        entry = _RESPONSE_CACHE.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= _CACHE_TTL_SECONDS:
+            del _RESPONSE_CACHE[key]
+            return None
+        _RESPONSE_CACHE.move_to_end(key)
+        return entry[1]
+
+
+def _cache_put(key: Optional[Tuple], response: str) -> None:
+    """(Internal) Stores a successful response, evicting the least recently used entry when full."""
+    if key is None:
+        return
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = (time.monotonic(), response)
+        _RESPONSE_CACHE.move_to_end(key)
+        while len(_RESPONSE_CACHE) > _CACHE_MAX_ENTRIES:
+            _RESPONSE_CACHE.popitem(last=False)
+
+
+def _describe_http_error(status_code: int, error_content: str) -> str:
+    """(Internal) Formats a Tavily HTTP error, preferring the 'error' field of a JSON error body."""
+    try:
+        # Tavily often returns JSON errors
+        error_json = json.loads(error_content)
+    except ValueError:
+        error_json = None
+    if isinstance(error_json, dict):
+        return f"Tavily API HTTP error: {status_code} - {error_json.get('error', error_content)}"
+    return f"Tavily API HTTP error: {status_code} - {error_content}"
 
-    This tool is optimized for AI agents, providing concise and relevant information.
-    It can search various topics, control the depth of the search, and optionally
-    include a direct answer to the query if found.
 
-    @param query (string): The search query. This is a required parameter.
-    @param search_depth (string): The depth of the search. 'basic' for a quick search, or 'advanced' for a more comprehensive search that may take longer and consume more credits. Optional. Default: 'basic'. enum:basic,advanced
-    @param include_answer (boolean): Whether to include a direct answer to the query in the search results, if available. Optional. Default: True.
-    @param max_results (integer): The maximum number of search results to return. Optional. Default: 3. (Tavily's max is typically around 5-7 for basic and 10 for advanced, but LLMs often prefer fewer, more focused results).
-    @param include_domains (List[string]): A list of specific domains to search within (e.g., ["wikipedia.org", "bbc.com"]). Optional. Default: None (search all domains).
-    @param exclude_domains (List[string]): A list of specific domains to exclude from the search (e.g., ["pinterest.com"]). Optional. Default: None (no domains excluded).
-    @param topic (string): The topic of the search, can be 'general', 'news', 'research_paper', 'code', etc. This helps Tavily focus the search. Optional. Default: 'general'. enum:general,news,finance,research_paper,code,sports
-    @param include_raw_content (boolean): Whether to include the raw HTML/text content of the search results. Use this for deep extraction. Optional. Default: False.
+def _build_tavily_payload(
+    query: str,
+    search_depth: str,
+    include_answer: bool,
+    max_results: int,
+    include_domains: Optional[List[str]],
+    exclude_domains: Optional[List[str]],
+    topic: str,
+    include_raw_content: bool
+) -> Union[str, Dict[str, Any]]:
+    """
+    (Internal) Validates the search arguments and builds the request payload.
+    Returns the payload dict, or a JSON error string if the call can't be made.
     """
     TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
     if not TAVILY_API_KEY:
@@ -41,17 +142,9 @@ def tavily_search(
 
     print(f"--- Tool: tavily_search called with query: '{query}', search_depth: '{search_depth}', include_answer: {include_answer}, max_results: {max_results}, include_raw_content: {include_raw_content} ---")
 
-    if not TAVILY_API_KEY:
-        return json.dumps({
-            "error": "Tavily API key (TAVILY_API_KEY) is not configured in the environment.",
-            "status": "error_misconfigured"
-        })
-
     if not query or not isinstance(query, str):
         return json.dumps({"error": "Invalid or empty search query provided.", "status": "error_invalid_input"})
 
-    url = "https://api.tavily.com/search"
-
     payload: Dict[str, Any] = {
         "api_key": TAVILY_API_KEY, # Tavily also accepts API key in payload
         "query": query,
@@ -75,35 +168,65 @@ def tavily_search(
     # "time_range": None, # Can be complex for LLM, better to use 'days'
     # "days": 7, # If you want to allow LLM to set recency
 
-    headers = {
-        # "Authorization": f"Bearer {TAVILY_API_KEY}", # Tavily docs show API key in payload, but bearer token is also an option
-        "Content-Type": "application/json"
-    }
-    # If you prefer Bearer token, uncomment above and remove api_key from payload.
-    # For simplicity, putting api_key in payload is common.
+    # Payload logging is opt-in; the api_key is left out of the log.
+    if os.environ.get("TAVILY_DEBUG"):
+        print("Tavily API Request Payload:", {k: v for k, v in payload.items() if k != "api_key"})
 
-    print(f"Tavily API Request Payload: {json.dumps(payload)}")
+    return payload
 
-    try:
-        response = requests.post(url, json=payload, headers=headers, timeout=20) # Tavily can sometimes take a moment for advanced searches
-        response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
 
-        search_data = response.json()
+def tavily_search(
+    query: str,
+    search_depth: str = "basic",
+    include_answer: bool = True,
+    max_results: int = 3,
+    include_domains: Optional[List[str]] = None,
+    exclude_domains: Optional[List[str]] = None,
+    topic: str = "general",
+    include_raw_content: bool = False
+) -> str:
+    """
+    Performs a search using the Tavily Search API and returns structured results.
+
+    This tool is optimized for AI agents, providing concise and relevant information.
+    It can search various topics, control the depth of the search, and optionally
+    include a direct answer to the query if found.
+
+    @param query (string): The search query. This is a required parameter.
+    @param search_depth (string): The depth of the search. 'basic' for a quick search, or 'advanced' for a more comprehensive search that may take longer and consume more credits. Optional. Default: 'basic'. enum:basic,advanced
+    @param include_answer (boolean): Whether to include a direct answer to the query in the search results, if available. Optional. Default: True.
+    @param max_results (integer): The maximum number of search results to return. Optional. Default: 3. (Tavily's max is typically around 5-7 for basic and 10 for advanced, but LLMs often prefer fewer, more focused results).
+    @param include_domains (List[string]): A list of specific domains to search within (e.g., ["wikipedia.org", "bbc.com"]). Optional. Default: None (search all domains).
+    @param exclude_domains (List[string]): A list of specific domains to exclude from the search (e.g., ["pinterest.com"]). Optional. Default: None (no domains excluded).
+    @param topic (string): The topic of the search, can be 'general', 'news', 'research_paper', 'code', etc. This helps Tavily focus the search. Optional. Default: 'general'. enum:general,news,finance,research_paper,code,sports
+    @param include_raw_content (boolean): Whether to include the raw HTML/text content of the search results. Use this for deep extraction. Optional. Default: False.
+    """
+    payload = _build_tavily_payload(
+        query, search_depth, include_answer, max_results,
+        include_domains, exclude_domains, topic, include_raw_content
+    )
+    if isinstance(payload, str):
+        return payload
+
+    cache_key = _cache_key(payload)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
 
+    try:
+        # The body is encoded here and sent as-is; headers already declare it as JSON.
+        body = _encode_body(payload)
+        response = _TAVILY_SESSION.post(_TAVILY_URL, data=body, headers=_TAVILY_HEADERS, timeout=20) # Tavily can sometimes take a moment for advanced searches
+        response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
 
-        # For simplicity now, return the direct response from Tavily, adding our status
-        search_data["status"] = "success"
-        return json.dumps(search_data)
+        # Return the direct response from Tavily, adding our status
+        result = _with_success_status(response.content)
+        _cache_put(cache_key, result)
+        return result
 
 
     except requests.exceptions.HTTPError as http_err:
-        error_content = http_err.response.text
-        try:
-            # Tavily often returns JSON errors
-            error_json = http_err.response.json()
-            error_message = f"Tavily API HTTP error: {http_err.response.status_code} - {error_json.get('error', error_content)}"
-        except json.JSONDecodeError:
-            error_message = f"Tavily API HTTP error: {http_err.response.status_code} - {error_content}"
+        error_message = _describe_http_error(http_err.response.status_code, http_err.response.text)
         print(error_message)
         return json.dumps({"error": error_message, "status": "error_api_http"})
     except requests.exceptions.Timeout:
@@ -114,6 +237,16 @@ def tavily_search(
         error_message = f"Request error occurred with Tavily API: {req_err}"
         print(error_message)
         return json.dumps({"error": error_message, "status": "error_api_request"})
+    except ValueError as e:
+        # Raised when a response body isn't valid UTF-8/JSON (JSONDecodeError subclasses ValueError).
+        error_message = f"Could not decode the Tavily API response: {e}"
+        print(error_message)
+        return json.dumps({"error": error_message, "status": "error_api"})
     except Exception as e:
-        print(f"Unexpected error in tavily_search: {e}\n{traceback.format_exc()}")
+        # The full stack is only formatted when explicitly debugging.
+        if os.environ.get("TAVILY_DEBUG"):
+            import traceback
+            print(f"Unexpected error in tavily_search: {e}\n{traceback.format_exc()}")
+        else:
+            print(f"Unexpected error in tavily_search: {type(e).__name__}: {e}")
         return json.dumps({"error": f"An unexpected error occurred: {str(e)}", "status": "error_unexpected"})
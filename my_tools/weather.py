@@ -3,18 +3,59 @@
 import openmeteo_requests
 import requests_cache
 from retry_requests import retry
-import pandas as pd
+from requests.adapters import HTTPAdapter
+import numpy as np
+import functools
 import json
+import threading
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
+from cachetools import TTLCache
+
+# --- Serialization ---
+# The success payload can hold thousands of entries (hourly forecasts), so it is encoded with
+# orjson when installed. Values are native Python types by the time they get here; default=str
+# only catches anything unexpected, as before. Small error responses stay on stdlib json.
+try:
+    import orjson
+
+    def _encode_result(obj) -> bytes:
+        return orjson.dumps(obj, default=str)
+
+    _loads_body = orjson.loads
+except ImportError:
+    def _encode_result(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':'), default=str).encode()
+
+    _loads_body = json.loads
+
+def _dumps_result(result_data: dict, sections: list) -> str:
+    """Serializes result_data followed by the already-encoded (key, bytes) sections, in order.
+    Each forecast section is encoded as soon as it is built so its column lists can be freed
+    before the next one is materialized, instead of holding the whole result until the end."""
+    out = bytearray(_encode_result(result_data))
+    if sections:
+        del out[-1]  # reopen the closing brace; result_data is never empty
+        for key, fragment in sections:
+            out += b',"' + key.encode() + b'":' + fragment
+        out += b"}"
+    return out.decode()
 
 # --- Geocoding Setup ---
 # Needs: pip install geopy
 try:
+    from geopy.adapters import RequestsAdapter
     from geopy.geocoders import Nominatim
     from geopy.exc import GeocoderTimedOut, GeocoderServiceError
-    geolocator = Nominatim(user_agent="ai_tool_weather_checker/1.1") # Updated agent slightly
+    # One module-wide geolocator backed by a keep-alive requests session, so repeat geocodes reuse
+    # the TLS connection. The pool is sized for waitress's 8 worker threads calling it concurrently;
+    # Nominatim is a single host, so only a couple of per-host pools are ever needed.
+    geolocator = Nominatim(
+        user_agent="ai_tool_weather_checker/1.1", # Updated agent slightly
+        adapter_factory=functools.partial(RequestsAdapter, pool_connections=2, pool_maxsize=8),
+    )
     GEOPY_AVAILABLE = True
 except ImportError:
     print("Warning: geopy library not found. Location name lookup will not work. Install with: pip install geopy")
@@ -23,10 +64,25 @@ except ImportError:
     class GeocoderServiceError(Exception): pass
 
 # --- API Client Setup ---
-# Needs: pip install requests-cache retry-requests openmeteo-requests pandas
-cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
+# Needs: pip install requests-cache retry-requests openmeteo-requests numpy
+# In-memory HTTP cache: the SQLite-backed '.cache' store serialized writers across waitress
+# threads, and parsed responses are cached per location below anyway.
+cache_session = requests_cache.CachedSession('openmeteo', backend='memory', expire_after=3600)
 retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
+# retry() mounts a default-sized adapter (10 connections per host); widen the pool so waitress
+# threads and batch workers share warm connections to api.open-meteo.com, keeping its Retry policy.
+retry_session.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=32, max_retries=retry_session.get_adapter("https://").max_retries,
+))
 openmeteo = openmeteo_requests.Client(session=retry_session)
+_FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+
+# requests_cache keys on the exact URL, so two lookups of the same place whose geocodes differ in
+# the last decimals (or that come from nearby names) each go to the API. Decoded responses are also
+# kept here keyed on coordinates rounded to 2 decimals (~1 km) plus everything else that shapes
+# the request. Units are part of the key: converted values can't be recovered after rounding.
+_RESPONSE_CACHE = TTLCache(maxsize=4096, ttl=1800)
+_response_cache_lock = threading.Lock()
 
 # --- Fixed Variable Lists ---
 DEFAULT_HOURLY_VARS = [
@@ -50,19 +106,44 @@ DEFAULT_CURRENT_VARS = [
 
 # --- Helper Functions (Implementations are the same as before) ---
 
+# Nominatim's usage policy allows at most one request per second. Geocoder calls can come from
+# several waitress threads or from a batch at once, so uncached lookups are spaced out here.
+_NOMINATIM_MIN_INTERVAL_SECONDS = 1.0
+_nominatim_rate_lock = threading.Lock()
+_nominatim_last_request = 0.0
+
+def _wait_for_nominatim_slot() -> None:
+    """Blocks until at least _NOMINATIM_MIN_INTERVAL_SECONDS have passed since the previous geocoder request."""
+    global _nominatim_last_request
+    with _nominatim_rate_lock:
+        delay = _nominatim_last_request + _NOMINATIM_MIN_INTERVAL_SECONDS - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        _nominatim_last_request = time.monotonic()
+
+@functools.lru_cache(maxsize=1024)
+def _geocode_cached(normalized_location: str) -> tuple[float | None, float | None]:
+    """
+    Geocodes a normalized location name; repeat lookups are served from memory.
+    A definitive "not found" is cached too, but errors propagate so transient failures are retried.
+    """
+    _wait_for_nominatim_slot()
+    location = geolocator.geocode(normalized_location, timeout=15)
+    if location:
+        print(f"Geocoded '{normalized_location}' to ({location.latitude:.4f}, {location.longitude:.4f})")
+        return location.latitude, location.longitude
+    print(f"Geocoding failed: Location '{normalized_location}' not found.")
+    return None, None
+
 def _get_coordinates(location_name: str) -> tuple[float | None, float | None]:
     """Converts a location name to latitude and longitude using geopy."""
     if not GEOPY_AVAILABLE:
         print("Error: Geopy is not installed, cannot lookup coordinates by name.")
         return None, None
+    # Case and spacing don't change the geocoder's answer, so they don't split the cache.
+    normalized_location = " ".join(location_name.split()).lower()
     try:
-        location = geolocator.geocode(location_name, timeout=15)
-        if location:
-            print(f"Geocoded '{location_name}' to ({location.latitude:.4f}, {location.longitude:.4f})")
-            return location.latitude, location.longitude
-        else:
-            print(f"Geocoding failed: Location '{location_name}' not found.")
-            return None, None
+        return _geocode_cached(normalized_location)
     except (GeocoderTimedOut, GeocoderServiceError) as e:
         print(f"Geocoding service error for '{location_name}': {e}")
         return None, None
@@ -71,6 +152,60 @@ def _get_coordinates(location_name: str) -> tuple[float | None, float | None]:
         print(traceback.format_exc())
         return None, None
 
+class _JsonVariable:
+    __slots__ = ("_value",)
+    def __init__(self, value): self._value = value
+    def Value(self): return self._value
+
+class _JsonCurrentResponse:
+    """A current-only JSON forecast response behind the same accessors as the FlatBuffers
+    WeatherApiResponse (the subset get_openmeteo_weather reads), so both are processed alike."""
+    def __init__(self, body: dict, variable_names: list):
+        self._body = body
+        current = body.get("current") or {}
+        self._time = current.get("time")
+        # FlatBuffers values are floats (weather_code 3.0, is_day 1.0); keep the output identical.
+        self._variables = [_JsonVariable(None if current.get(name) is None else float(current[name]))
+                           for name in variable_names]
+    def Latitude(self): return self._body["latitude"]
+    def Longitude(self): return self._body["longitude"]
+    def Timezone(self): return self._body.get("timezone")
+    def TimezoneAbbreviation(self): return self._body.get("timezone_abbreviation")
+    def UtcOffsetSeconds(self): return self._body.get("utc_offset_seconds")
+    def Elevation(self): return self._body.get("elevation")
+    def Current(self): return self if self._time is not None else None
+    def Time(self): return self._time
+    def VariablesLength(self): return len(self._variables)
+    def Variables(self, i): return self._variables[i]
+
+def _fetch_current_json(params: dict) -> _JsonCurrentResponse:
+    """Current-only requests are a few dozen bytes of JSON; fetching them as JSON skips the
+    FlatBuffers decode and its one Python call per variable."""
+    response = retry_session.get(_FORECAST_URL, params={**params, "format": "json", "timeformat": "unixtime"})
+    if response.status_code in (400, 429):
+        raise openmeteo_requests.ApiError(_loads_body(response.content).get("reason", response.text))
+    response.raise_for_status()
+    return _JsonCurrentResponse(_loads_body(response.content), params["current"])
+
+def _fetch_weather_response(params: dict):
+    """Returns the first Open-Meteo response for params, served from _RESPONSE_CACHE when possible."""
+    key = (round(params["latitude"], 2), round(params["longitude"], 2), params["temperature_unit"],
+           "current" in params, "hourly" in params, "daily" in params,
+           params.get("forecast_days"), params.get("past_days"))
+    with _response_cache_lock:
+        response = _RESPONSE_CACHE.get(key)
+    if response is not None:
+        print(f"Weather response cache hit for {key}")
+        return response
+    # Fetched outside the lock so concurrent lookups for other locations aren't serialized.
+    if "hourly" in params or "daily" in params:
+        response = openmeteo.weather_api(_FORECAST_URL, params=params)[0]
+    else:
+        response = _fetch_current_json(params)
+    with _response_cache_lock:
+        _RESPONSE_CACHE[key] = response
+    return response
+
 def _decode_bytes(value):
     """Safely decodes bytes to utf-8 string, returns original value otherwise."""
     return value.decode('utf-8') if isinstance(value, bytes) else value
@@ -88,26 +223,133 @@ def _format_timestamp(unix_ts: int | float, timezone_offset: int) -> str:
         except Exception:
             return str(unix_ts)
 
+def _local_iso_strings(epoch_seconds, utc_offset_seconds: int, unit: str = "s") -> list:
+    """
+    Vectorized counterpart of _format_timestamp for a whole array of UNIX timestamps.
+    unit="s" gives the same strings as datetime.isoformat() with the fixed offset;
+    unit="D" gives just the local dates ("YYYY-MM-DD").
+    """
+    local = (np.asarray(epoch_seconds, dtype=np.int64) + utc_offset_seconds).astype("datetime64[s]")
+    if unit == "D":
+        return np.datetime_as_string(local.astype("datetime64[D]")).tolist()
+    # isoformat() renders the offset as +HH:MM (with :SS only when needed); take it from a reference datetime.
+    suffix = datetime(2000, 1, 1, tzinfo=timezone(timedelta(seconds=utc_offset_seconds))).isoformat()[19:]
+    return np.char.add(np.datetime_as_string(local, unit="s"), suffix).tolist()
+
+# WMO weather interpretation codes, as documented by Open-Meteo.
+_WMO_CODES = {
+    0: "Clear sky", 1: "Mainly clear", 2: "Partly cloudy", 3: "Overcast",
+    45: "Fog or freezing fog", 48: "Fog or freezing fog",
+    51: "Drizzle (Light)", 53: "Drizzle (Moderate)", 55: "Drizzle (Dense)",
+    56: "Freezing Drizzle (Light)", 57: "Freezing Drizzle (Dense)",
+    61: "Rain (Slight)", 63: "Rain (Moderate)", 65: "Rain (Heavy)",
+    66: "Freezing Rain (Light)", 67: "Freezing Rain (Heavy)",
+    71: "Snow fall (Slight)", 73: "Snow fall (Moderate)", 75: "Snow fall (Heavy)",
+    77: "Snow grains",
+    80: "Rain showers (Slight)", 81: "Rain showers (Moderate)", 82: "Rain showers (Violent)",
+    85: "Snow showers (Slight)", 86: "Snow showers (Heavy)",
+    95: "Thunderstorm (Slight or moderate)",
+    96: "Thunderstorm with hail (Slight/Moderate)", 99: "Thunderstorm with hail (Heavy)"
+}
+
 def _get_wmo_description(code: int | float | None) -> str | None:
     """Returns a text description for a WMO weather code."""
-    if code is None or pd.isna(code): return None
+    if code is None or code != code: return None  # code != code only for NaN
     try: code = int(code)
     except (ValueError, TypeError): return f"Invalid WMO Code ({code})"
-    codes = {
-        0: "Clear sky", 1: "Mainly clear", 2: "Partly cloudy", 3: "Overcast",
-        45: "Fog or freezing fog", 48: "Fog or freezing fog",
-        51: "Drizzle (Light)", 53: "Drizzle (Moderate)", 55: "Drizzle (Dense)",
-        56: "Freezing Drizzle (Light)", 57: "Freezing Drizzle (Dense)",
-        61: "Rain (Slight)", 63: "Rain (Moderate)", 65: "Rain (Heavy)",
-        66: "Freezing Rain (Light)", 67: "Freezing Rain (Heavy)",
-        71: "Snow fall (Slight)", 73: "Snow fall (Moderate)", 75: "Snow fall (Heavy)",
-        77: "Snow grains",
-        80: "Rain showers (Slight)", 81: "Rain showers (Moderate)", 82: "Rain showers (Violent)",
-        85: "Snow showers (Slight)", 86: "Snow showers (Heavy)",
-        95: "Thunderstorm (Slight or moderate)",
-        96: "Thunderstorm with hail (Slight/Moderate)", 99: "Thunderstorm with hail (Heavy)"
-    }
-    return codes.get(code, f"WMO Code {code}")
+    return _WMO_CODES.get(code, f"WMO Code {code}")
+
+
+def _rounded_column(arr, length: int, decimals: int) -> list:
+    """
+    Converts a variable's NumPy values into a list of `length` native floats rounded to `decimals`,
+    with None where the value is NaN or the array is too short. Works on the whole array at once.
+    """
+    values = np.full(length, np.nan)
+    src = np.asarray(arr, dtype=np.float64)[:length]
+    values[:len(src)] = src
+    missing = np.isnan(values)
+    column = np.round(values, decimals).astype(object)
+    column[missing] = None
+    return column.tolist()
+
+def _wmo_descriptions(arr, length: int) -> list:
+    """Per-timestep WMO descriptions for a weather_code array (None where NaN); each distinct code is looked up once."""
+    descriptions = np.full(length, None, dtype=object)
+    codes = np.asarray(arr, dtype=np.float64)[:length]
+    valid = np.flatnonzero(~np.isnan(codes))
+    if valid.size:
+        unique_codes, inverse = np.unique(codes[valid].astype(np.int64), return_inverse=True)
+        lookup = np.empty(len(unique_codes), dtype=object)
+        lookup[:] = [_get_wmo_description(int(code)) for code in unique_codes]
+        descriptions[valid] = lookup[inverse.ravel()]
+    return descriptions.tolist()
+
+# --- Unit Lookup ---
+# Each variable's unit *kind* is fixed, so it is resolved once here rather than per call.
+# Kinds that depend on the requested units (TEMP/PRECIP/WIND) are labelled in _resolved_units.
+_CURRENT_PRECIP_NAMES = frozenset({"precipitation", "rain", "showers", "snowfall"})
+_HOURLY_PRECIP_NAMES = _CURRENT_PRECIP_NAMES | {"snow_depth"}
+_SUN_NAMES = frozenset({"sunrise", "sunset"})
+_VALID_UNITS = frozenset({"celsius", "fahrenheit"})
+_VALID_REQUEST_TYPES = frozenset({"current", "hourly", "daily"})
+
+def _current_unit_kind(name: str) -> str | None:
+    if "temperature" in name: return "TEMP"
+    elif "humidity" in name: return "PCT"
+    elif name in _CURRENT_PRECIP_NAMES: return "PRECIP"
+    elif name == "cloud_cover": return "PCT"
+    elif "wind_speed" in name or "wind_gusts" in name: return "WIND"
+    elif "wind_direction" in name: return "DEG"
+    return None
+
+def _hourly_unit_kind(name: str) -> str | None:
+    if "temperature" in name: return "TEMP"
+    elif "humidity" in name: return "PCT"
+    elif name in _HOURLY_PRECIP_NAMES: return "PRECIP"
+    elif "probability" in name: return "PCT"
+    elif name == "cloud_cover": return "PCT"
+    elif "wind_speed" in name or "wind_gusts" in name: return "WIND"
+    elif "wind_direction" in name: return "DEG"
+    elif name == "visibility": return "M"
+    return None
+
+def _daily_unit_kind(name: str) -> str | None:
+    if "temperature" in name: return "TEMP"
+    elif "_sum" in name or "precipitation_hours" in name: return "PRECIP"
+    elif "_max" in name and ("wind_speed" in name or "wind_gusts" in name): return "WIND"
+    elif "_max" in name and "probability" in name: return "PCT"
+    elif "_dominant" in name and "wind_direction" in name: return "DEG"
+    elif name == "uv_index_max": return "UV"
+    return None
+
+_CURRENT_UNIT_KINDS = {name: _current_unit_kind(name) for name in DEFAULT_CURRENT_VARS}
+_HOURLY_UNIT_KINDS = {name: _hourly_unit_kind(name) for name in DEFAULT_HOURLY_VARS}
+_DAILY_UNIT_KINDS = {name: _daily_unit_kind(name) for name in DEFAULT_DAILY_VARS}
+
+@functools.lru_cache(maxsize=None)
+def _resolved_units(temp_unit_char: str, precip_unit: str, wind_unit: str) -> tuple[dict, dict, dict]:
+    """Resolves every current/hourly/daily variable to its display unit (or None) for one unit
+    setting. There are only a couple of settings, so each is resolved once per process.
+    The returned dicts are shared between calls and must not be modified."""
+    labels = {"TEMP": temp_unit_char, "PRECIP": precip_unit, "WIND": wind_unit,
+              "PCT": "%", "DEG": "degrees", "M": "meters", "UV": "UV Index"}
+    return tuple({name: labels.get(kind) for name, kind in kinds.items()}
+                 for kinds in (_CURRENT_UNIT_KINDS, _HOURLY_UNIT_KINDS, _DAILY_UNIT_KINDS))
+
+def _add_column(forecast: dict, name: str, values: list, unit: str | None, descriptions: list | None = None) -> bool:
+    """
+    Adds one variable to a columnar forecast as {"unit", "values"[, "descriptions"]}, aligned with its
+    "time"/"date" list (None where no value). Variables with no values at all are left out.
+    Returns True if the variable was added.
+    """
+    if values.count(None) == len(values): return False
+    column = {}
+    if unit: column["unit"] = unit
+    column["values"] = values
+    if descriptions is not None: column["descriptions"] = descriptions
+    forecast[name] = column
+    return True
 
 
 # --- Main Tool Function ---
@@ -125,6 +367,10 @@ def get_openmeteo_weather(
     including temperature, precipitation, wind, weather codes, and potentially hourly/daily
     forecasts based on request_types.
 
+    Hourly and daily forecasts are column-oriented: a "time" (hourly) or "date" (daily) list, plus
+    one {"unit", "values"} object per variable whose "values" line up index-by-index with it
+    (null where no value). weather_code also carries a matching "descriptions" list.
+
     @param location (string): The city and state/country, e.g., "Paris France", "London UK", "Topeka KS USA". This is required.
     @param units (string): Temperature units ('celsius' or 'fahrenheit'). Optional. Defaults to 'fahrenheit'. enum:celsius,fahrenheit
     @param request_types (string): Comma-separated list of data types: 'current', 'hourly', 'daily'. Optional. Defaults to 'current'. Example: "current,hourly". enum:current,hourly,daily
@@ -159,12 +405,12 @@ def get_openmeteo_weather(
     forecast_days = 7 if forecast_days is None else max(1, min(int(forecast_days), 16))
     past_days = 0 if past_days is None else max(0, min(int(past_days), 92))
     units = units.lower() if units and isinstance(units, str) else "fahrenheit"
-    if units not in ["celsius", "fahrenheit"]:
+    if units not in _VALID_UNITS:
         print(f"Warning: Invalid units '{units}' provided. Defaulting to fahrenheit.")
         units = "fahrenheit"
 
     req_types_set = {rt.strip().lower() for rt in request_types.split(',') if rt.strip()} if request_types else {'current'}
-    if not req_types_set.issubset({'current', 'hourly', 'daily'}):
+    if not req_types_set <= _VALID_REQUEST_TYPES:
          print(f"Warning: Invalid request_types found. Using 'current'. Input: '{request_types}'")
          req_types_set = {'current'}
 
@@ -189,15 +435,14 @@ def get_openmeteo_weather(
 
     # --- Call API and Process Response ---
     try:
-        responses = openmeteo.weather_api("https://api.open-meteo.com/v1/forecast", params=params)
-        response = responses[0]
+        response = _fetch_weather_response(params)
 
         latitude_found = response.Latitude()
         longitude_found = response.Longitude()
         timezone_api = _decode_bytes(response.Timezone())
         timezone_abbr_api = _decode_bytes(response.TimezoneAbbreviation())
-        utc_offset_seconds = response.UtcOffsetSeconds() if hasattr(response, 'UtcOffsetSeconds') and response.UtcOffsetSeconds() is not None else 0
-        elevation = response.Elevation() if hasattr(response, 'Elevation') else None
+        utc_offset_seconds = response.UtcOffsetSeconds() or 0
+        elevation = response.Elevation()
 
         print(f"API Response Coords: {latitude_found:.4f}°N {longitude_found:.4f}°E, Elev: {elevation}m")
         print(f"API Response Timezone: {timezone_api} ({timezone_abbr_api}), Offset: {utc_offset_seconds}s")
@@ -215,6 +460,8 @@ def get_openmeteo_weather(
                 "uv_index": "UV Index"
             },
             "status": "success",
+            # 2: hourly/daily forecasts are columnar ({"time": [...], "<variable>": {"unit", "values"}}).
+            "schema_version": 2,
             "data_requested": {
                  "current": request_current, "hourly": request_hourly, "daily": request_daily,
                  "forecast_days": params.get("forecast_days"), "past_days": params.get("past_days")
@@ -224,29 +471,29 @@ def get_openmeteo_weather(
         temp_unit_char = result_data["units"]["temperature"]
         precip_unit = result_data["units"]["precipitation"]
         wind_unit = result_data["units"]["wind_speed"]
+        current_units, hourly_units, daily_units = _resolved_units(temp_unit_char, precip_unit, wind_unit)
+
+        # (key, encoded JSON) per section, appended in output order.
+        sections = []
+        got_current = got_hourly = got_daily = False
 
         # --- Process Current Data ---
-        if request_current and hasattr(response, 'Current') and callable(response.Current):
-            current = response.Current()
+        if request_current:
+            try: current, empty_message = response.Current(), "Current data block received but was empty."
+            except AttributeError: current, empty_message = None, "Current data requested but not found in API response."
             if current:
                 current_data = {"time": _format_timestamp(current.Time(), utc_offset_seconds)}
                 values = {}
                 for i in range(min(len(DEFAULT_CURRENT_VARS), current.VariablesLength())):
                     var_name = DEFAULT_CURRENT_VARS[i]
                     value = current.Variables(i).Value()
-                    if pd.isna(value): value = None
+                    if value is None or value != value: value = None  # NaN -> None
                     values[var_name] = value
 
                 processed_current = {}
                 for name, value in values.items():
                     if value is None: continue
-                    unit, description = None, None
-                    if "temperature" in name: unit = temp_unit_char
-                    elif "humidity" in name: unit = "%"
-                    elif name in ["precipitation", "rain", "showers", "snowfall"]: unit = precip_unit
-                    elif name == "cloud_cover": unit = "%"
-                    elif "wind_speed" in name or "wind_gusts" in name: unit = wind_unit
-                    elif "wind_direction" in name: unit = "degrees"
+                    unit, description = current_units.get(name), None
                     if name == "weather_code": description = _get_wmo_description(value)
                     elif name == "is_day": description = "Daytime" if value == 1 else "Nighttime"
 
@@ -255,158 +502,108 @@ def get_openmeteo_weather(
                     if description: entry["description"] = description
                     processed_current[name] = entry
 
-                if processed_current: current_data["data"] = processed_current
+                if processed_current: current_data["data"] = processed_current; got_current = True
                 else: current_data["message"] = "No current data values available."
-                result_data["current_conditions"] = current_data
-            else: result_data["current_conditions"] = {"message": "Current data block received but was empty."}
-        elif request_current: result_data["current_conditions"] = {"message": "Current data requested but not found in API response."}
+                sections.append(("current_conditions", _encode_result(current_data)))
+            else: sections.append(("current_conditions", _encode_result({"message": empty_message})))
 
         # --- Process Hourly Data ---
         
-        if request_hourly and hasattr(response, 'Hourly') and callable(response.Hourly):
-            hourly = response.Hourly()
+        if request_hourly:
+            try: hourly, empty_message = response.Hourly(), "Hourly data block received but was empty."
+            except AttributeError: hourly, empty_message = None, "Hourly data requested but not found in API response."
             if hourly and hourly.VariablesLength() > 0:
                 try:
-                    hourly_times_raw = pd.to_datetime(hourly.Time(), unit="s", utc=True)
-                    hourly_times_end_raw = pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True)
-                    interval = pd.Timedelta(seconds=hourly.Interval())
-                    hourly_times = pd.date_range(start=hourly_times_raw, end=hourly_times_end_raw, freq=interval, inclusive="left")
-                    hourly_times_local_iso = [_format_timestamp(ts.timestamp(), utc_offset_seconds) for ts in hourly_times]
+                    # UNIX seconds for each step in [Time, TimeEnd)
+                    hourly_times = np.arange(hourly.Time(), hourly.TimeEnd(), hourly.Interval(), dtype=np.int64)
+                    hourly_times_local_iso = _local_iso_strings(hourly_times, utc_offset_seconds)
                     time_range_valid = True
                 except Exception as e:
                      print(f"Error generating hourly time range: {e}")
                      hourly_times_local_iso = []
                      time_range_valid = False
-                     result_data["hourly_forecast"] = {"message": f"Error processing hourly time data: {e}"}
+                     sections.append(("hourly_forecast", _encode_result({"message": f"Error processing hourly time data: {e}"})))
 
                 if time_range_valid:
-                    hourly_data_arrays = {}
+                    n_times = len(hourly_times_local_iso)
+                    hourly_forecast = {"time": hourly_times_local_iso}
+                    has_hourly_values = False
                     num_vars_in_response = hourly.VariablesLength()
                     for i, name in enumerate(DEFAULT_HOURLY_VARS):
-                        if i < num_vars_in_response:
-                           try: hourly_data_arrays[name] = hourly.Variables(i).ValuesAsNumpy()
-                           except Exception as e:
-                                print(f"Error extracting hourly numpy array for '{name}' (index {i}): {e}")
-                                hourly_data_arrays[name] = [None] * len(hourly_times)
-                        else:
-                            print(f"Warn: Hourly var '{name}' (idx {i}) missing. Padding.")
-                            hourly_data_arrays[name] = [None] * len(hourly_times)
-
-                    hourly_forecast_list = []
-                    for t_idx, local_iso_time in enumerate(hourly_times_local_iso):
-                        step_data = {"time": local_iso_time}
-                        processed_hourly_step = {}
-                        for name, arr in hourly_data_arrays.items():
-                            value = arr[t_idx] if t_idx < len(arr) else None
-                            if pd.isna(value): value = None
-                            if value is None: continue
-                            unit, description = None, None
-                            if "temperature" in name: unit = temp_unit_char
-                            elif "humidity" in name: unit = "%"
-                            elif name in ["precipitation", "rain", "showers", "snowfall", "snow_depth"]: unit = precip_unit
-                            elif "probability" in name: unit = "%"
-                            elif name == "cloud_cover": unit = "%"
-                            elif "wind_speed" in name or "wind_gusts" in name: unit = wind_unit
-                            elif "wind_direction" in name: unit = "degrees"
-                            elif name == "visibility": unit = "meters"
-                            if name == "weather_code": description = _get_wmo_description(value)
-
-                            entry = {"value": round(value, 2) if isinstance(value, float) else value}
-                            if unit: entry["unit"] = unit
-                            if description: entry["description"] = description
-                            processed_hourly_step[name] = entry
-                        if processed_hourly_step:
-                             step_data["data"] = processed_hourly_step
-                             hourly_forecast_list.append(step_data)
-                    if hourly_forecast_list: result_data["hourly_forecast"] = hourly_forecast_list
-                    elif time_range_valid: result_data["hourly_forecast"] = {"message": "Hourly data block received but contained no valid data points."}
-
-            else: result_data["hourly_forecast"] = {"message": "Hourly data block received but was empty."}
-        elif request_hourly: result_data["hourly_forecast"] = {"message": "Hourly data requested but not found in API response."}
+                        if i >= num_vars_in_response:
+                            print(f"Warn: Hourly var '{name}' (idx {i}) missing. Skipping.")
+                            continue
+                        try: arr = hourly.Variables(i).ValuesAsNumpy()
+                        except Exception as e:
+                            print(f"Error extracting hourly numpy array for '{name}' (index {i}): {e}")
+                            continue
+                        descriptions = _wmo_descriptions(arr, n_times) if name == "weather_code" else None
+                        if _add_column(hourly_forecast, name, _rounded_column(arr, n_times, 2), hourly_units[name], descriptions):
+                            has_hourly_values = True
+
+                    if has_hourly_values: sections.append(("hourly_forecast", _encode_result(hourly_forecast))); got_hourly = True
+                    else: sections.append(("hourly_forecast", _encode_result({"message": "Hourly data block received but contained no valid data points."})))
+                    del hourly_forecast, hourly_times_local_iso
+
+            else: sections.append(("hourly_forecast", _encode_result({"message": empty_message})))
 
 
         # --- Process Daily Data ---
         
-        if request_daily and hasattr(response, 'Daily') and callable(response.Daily):
-            daily = response.Daily()
+        if request_daily:
+            try: daily, empty_message = response.Daily(), "Daily data block received but was empty."
+            except AttributeError: daily, empty_message = None, "Daily data requested but not found in API response."
             if daily and daily.VariablesLength() > 0:
                 try:
-                    daily_times_raw = pd.to_datetime(daily.Time(), unit="s", utc=True)
-                    daily_times_end_raw = pd.to_datetime(daily.TimeEnd(), unit="s", utc=True)
-                    interval = pd.Timedelta(seconds=daily.Interval())
-                    daily_times = pd.date_range(start=daily_times_raw, end=daily_times_end_raw, freq=interval, inclusive="left")
-                    daily_dates_local = [_format_timestamp(ts.timestamp(), utc_offset_seconds).split('T')[0] for ts in daily_times]
+                    daily_times = np.arange(daily.Time(), daily.TimeEnd(), daily.Interval(), dtype=np.int64)
+                    daily_dates_local = _local_iso_strings(daily_times, utc_offset_seconds, unit="D")
                     time_range_valid = True
                 except Exception as e:
                      print(f"Error generating daily time range: {e}")
                      daily_dates_local = []
                      time_range_valid = False
-                     result_data["daily_forecast"] = {"message": f"Error processing daily time data: {e}"}
+                     sections.append(("daily_forecast", _encode_result({"message": f"Error processing daily time data: {e}"})))
 
                 if time_range_valid:
-                    daily_data_arrays = {}
+                    n_days = len(daily_dates_local)
+                    daily_forecast = {"date": daily_dates_local}
+                    has_daily_values = False
                     num_vars_in_response = daily.VariablesLength()
                     for i, name in enumerate(DEFAULT_DAILY_VARS):
-                        if i < num_vars_in_response:
-                            try:
-                                if name in ["sunrise", "sunset"]: daily_data_arrays[name] = daily.Variables(i).ValuesInt64AsNumpy()
-                                else: daily_data_arrays[name] = daily.Variables(i).ValuesAsNumpy()
-                            except Exception as e:
-                                print(f"Error extracting daily numpy array for '{name}' (index {i}): {e}")
-                                daily_data_arrays[name] = [None] * len(daily_times)
-                        else:
-                             print(f"Warn: Daily var '{name}' (idx {i}) missing. Padding.")
-                             daily_data_arrays[name] = [None] * len(daily_times)
-
-                    daily_forecast_list = []
-                    for d_idx, local_date in enumerate(daily_dates_local):
-                        step_data = {"date": local_date}
-                        processed_daily_step = {}
-                        for name, arr in daily_data_arrays.items():
-                            value = arr[d_idx] if d_idx < len(arr) else None
-                            if pd.isna(value): value = None
-                            if value is None: continue
-                            unit, description = None, None
-                            if "temperature" in name: unit = temp_unit_char
-                            elif "_sum" in name or "precipitation_hours" in name: unit = precip_unit
-                            elif "_max" in name and ("wind_speed" in name or "wind_gusts" in name): unit = wind_unit
-                            elif "_max" in name and "probability" in name: unit = "%"
-                            elif "_dominant" in name and "wind_direction" in name: unit = "degrees"
-                            elif name == "uv_index_max":
-                                 unit = "UV Index"
-                                 value = round(value, 1) if isinstance(value, float) else value
-                            elif name in ["sunrise", "sunset"]:
-                                 try: value = _format_timestamp(value, utc_offset_seconds)
-                                 except Exception as ts_e:
-                                     print(f"Error formatting sunrise/sunset timestamp {value}: {ts_e}")
-                                     value = None
-                            if name == "weather_code": description = _get_wmo_description(value)
-
-                            if value is not None:
-                                entry = {"value": round(value, 2) if isinstance(value, float) and name != "uv_index_max" else value}
-                                if unit: entry["unit"] = unit
-                                if description: entry["description"] = description
-                                processed_daily_step[name] = entry
-                        if processed_daily_step:
-                            step_data["data"] = processed_daily_step
-                            daily_forecast_list.append(step_data)
-                    if daily_forecast_list: result_data["daily_forecast"] = daily_forecast_list
-                    elif time_range_valid: result_data["daily_forecast"] = {"message": "Daily data block received but contained no valid data points."}
-
-            else: result_data["daily_forecast"] = {"message": "Daily data block received but was empty."}
-        elif request_daily: result_data["daily_forecast"] = {"message": "Daily data requested but not found in API response."}
+                        if i >= num_vars_in_response:
+                            print(f"Warn: Daily var '{name}' (idx {i}) missing. Skipping.")
+                            continue
+                        try:
+                            if name in _SUN_NAMES:
+                                # int64 UNIX seconds -> local ISO strings
+                                values = _local_iso_strings(daily.Variables(i).ValuesInt64AsNumpy()[:n_days], utc_offset_seconds)
+                                values += [None] * (n_days - len(values))
+                                if _add_column(daily_forecast, name, values, None):
+                                    has_daily_values = True
+                                continue
+                            arr = daily.Variables(i).ValuesAsNumpy()
+                        except Exception as e:
+                            print(f"Error extracting daily numpy array for '{name}' (index {i}): {e}")
+                            continue
+                        descriptions = _wmo_descriptions(arr, n_days) if name == "weather_code" else None
+                        decimals = 1 if name == "uv_index_max" else 2
+                        if _add_column(daily_forecast, name, _rounded_column(arr, n_days, decimals), daily_units[name], descriptions):
+                            has_daily_values = True
+
+                    if has_daily_values: sections.append(("daily_forecast", _encode_result(daily_forecast))); got_daily = True
+                    else: sections.append(("daily_forecast", _encode_result({"message": "Daily data block received but contained no valid data points."})))
+                    del daily_forecast, daily_dates_local
+
+            else: sections.append(("daily_forecast", _encode_result({"message": empty_message})))
 
         # --- Final Status Check ---
-        got_current = isinstance(result_data.get("current_conditions", {}).get("data"), dict) and result_data["current_conditions"]["data"]
-        got_hourly = isinstance(result_data.get("hourly_forecast"), list) and result_data["hourly_forecast"]
-        got_daily = isinstance(result_data.get("daily_forecast"), list) and result_data["daily_forecast"]
         if not (got_current or got_hourly or got_daily) and result_data.get("status") == "success":
              result_data["status"] = "success_no_data_retrieved"
              result_data["message"] = "API call succeeded but failed to retrieve any valid weather data."
-             result_data.pop("current_conditions", None); result_data.pop("hourly_forecast", None); result_data.pop("daily_forecast", None)
+             sections = []
 
         print(f"--- Tool Success: Returning weather data for '{location}' ---")
-        return json.dumps(result_data, separators=(',', ':'), default=str)
+        return _dumps_result(result_data, sections)
 
     except openmeteo_requests.ApiError as e:
         print(f"Open-Meteo API Error: {e}")
@@ -419,6 +616,56 @@ def get_openmeteo_weather(
         return json.dumps({"error": f"An unexpected error occurred processing weather data{loc_info}: {str(e)}", "status": "error_unexpected"})
 
 
+# Upper bound on locations per batch call; also the number of worker threads used.
+_MAX_BATCH_LOCATIONS = 10
+
+def get_openmeteo_weather_batch(
+    locations: list,
+    units: str = "fahrenheit",
+    request_types: str = "current",
+    forecast_days: int = 7,
+    past_days: int = 0
+) -> str:
+    """Gets current conditions and/or forecasts for several locations in one call using the Open-Meteo API.
+
+    Locations are fetched concurrently, so this is much faster than calling get_openmeteo_weather
+    once per place. Each entry of 'results' has the same shape as a get_openmeteo_weather response
+    (including its own 'status'), in the same order as the requested locations.
+
+    @param locations (List[string]): The places to look up, e.g. ["Paris France", "London UK"]. A single string with locations separated by ';' is also accepted. At most 10. This is required.
+    @param units (string): Temperature units ('celsius' or 'fahrenheit'). Optional. Defaults to 'fahrenheit'. enum:celsius,fahrenheit
+    @param request_types (string): Comma-separated list of data types: 'current', 'hourly', 'daily'. Optional. Defaults to 'current'. Example: "current,hourly". enum:current,hourly,daily
+    @param forecast_days (integer): Number of forecast days (1-16). Optional. Default: 7. Applies only if 'hourly' or 'daily' is requested.
+    @param past_days (integer): Number of past days to include (0-92). Optional. Default: 0. Applies only if 'hourly' or 'daily' is requested.
+
+    Returns:
+        string: A JSON string with a 'results' list holding one weather result per location, or an error message.
+    """
+    print(f"--- Tool: get_openmeteo_weather_batch called with locations={locations!r} ---")
+    if isinstance(locations, str):
+        locations = [part.strip() for part in locations.split(';') if part.strip()]
+    if not locations or not isinstance(locations, list) or not all(isinstance(loc, str) and loc.strip() for loc in locations):
+        return json.dumps({
+            "error": "Invalid locations provided. Please provide a list of location names (city and state/country).",
+            "status": "error_invalid_location_input"
+        })
+    if len(locations) > _MAX_BATCH_LOCATIONS:
+        return json.dumps({
+            "error": f"Too many locations ({len(locations)}). At most {_MAX_BATCH_LOCATIONS} can be requested per call.",
+            "status": "error_invalid_location_input"
+        })
+
+    # Each location is an independent, mostly network-bound call; geocoding stays rate-limited across threads.
+    with ThreadPoolExecutor(max_workers=len(locations)) as pool:
+        results = list(pool.map(
+            lambda loc: get_openmeteo_weather(loc, units, request_types, forecast_days, past_days),
+            locations
+        ))
+
+    # Every result is already a JSON document, so they are spliced in as-is rather than re-parsed.
+    return '{"status":"success","count":%d,"results":[%s]}' % (len(results), ",".join(results))
+
+
 # --- Example Test block ---
 if __name__ == '__main__':
     print("--- Testing get_openmeteo_weather Tool ---")
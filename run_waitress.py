@@ -1,13 +1,21 @@
-from waitress import serve
-import app
 from dotenv import load_dotenv
 
+# Load .env before the app is imported: several modules read the environment at import time.
+load_dotenv()
+
+import os
 import sys
 import pprint # Pretty-print, makes the output easier to read
 
+from waitress import serve
+import app
+
 print(f"\n\n--- PYTHON IS SEARCHING THESE PATHS FOR MODULES ---")
 pprint.pprint(sys.path)
 print("----------------------------------------------------\n\n")
 
-serve(app.app, host='0.0.0.0', port=5001, threads=8)
-load_dotenv()
\ No newline at end of file
+# The app keeps chat instances, DB connections and the session secret in this process's memory,
+# so it is served from a single process; scale concurrent requests with WAITRESS_THREADS instead.
+threads = int(os.getenv("WAITRESS_THREADS", "8"))
+
+serve(app.app, host='0.0.0.0', port=5001, threads=threads)
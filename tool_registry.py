@@ -1,8 +1,21 @@
 # In a new file, e.g., tool_registry.py
 import os
+import sys
+import threading
 import importlib.util
 import inspect
 
+# Held only around an actual import, so concurrent loaders don't import the same tool module twice.
+_IMPORT_LOCK = threading.Lock()
+
+def _cached_import(module_path):
+    """Returns the already-imported module from sys.modules, importing it only on a miss."""
+    module = sys.modules.get(module_path)
+    if module is None:
+        with _IMPORT_LOCK:
+            module = importlib.import_module(module_path)
+    return module
+
 def load_tools_from_directory(directory="my_tools"):
     """
     Scans the 'my_tools' directory, imports all the Python functions,
@@ -13,17 +26,20 @@ def load_tools_from_directory(directory="my_tools"):
 
     # We need to add the project root to the path for imports to work
     project_root = os.path.abspath(os.path.join(directory, '..'))
-    import sys
     if project_root not in sys.path:
         sys.path.insert(0, project_root)
 
-    for filename in os.listdir(directory):
+    # scandir's entries carry the file type from the directory read, so no extra stat per file.
+    with os.scandir(directory) as entries:
+        filenames = [entry.name for entry in entries if entry.is_file()]
+
+    for filename in filenames:
         if filename.endswith('.py') and not filename.startswith('__'):
             module_name = filename[:-3]
             module_path = f"{os.path.basename(directory)}.{module_name}"
 
             try:
-                module = importlib.import_module(module_path)
+                module = _cached_import(module_path)
                 for name, func in inspect.getmembers(module, inspect.isfunction):
                     # Register public functions from the module
                     if not name.startswith('_') and func.__module__ == module.__name__:
@@ -8,6 +8,10 @@ import chromadb # The new, package-friendly library
 import configparser
 import sys
 import hashlib
+import numpy as np
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 
 # --- Configuration ---
 
@@ -42,22 +46,131 @@ TOOLS_DIRECTORY = os.path.join(project_root, tools_dir_from_config) # Needed in
 # --- Other Settings ---
 COLLECTION_NAME = "tools"
 MODEL_NAME = config['Models']['EMBEDDING_MODEL']
+# Tool files that are never indexed: the find_best_tool proxy, plus any listed under
+# [Tools] EXCLUDED_FILES (comma-separated) in config.ini.
+_EXCLUDED = frozenset({'find_best_tool.py', '__init__.py'}) | frozenset(
+    name.strip() for name in config.get('Tools', 'EXCLUDED_FILES', fallback='').split(',') if name.strip()
+)
+# Concurrent per-document requests used when batch embedding isn't available.
+EMBED_WORKERS = 8
+# Tools written per collection.upsert call; Chroma handles medium batches faster than one large one.
+UPSERT_BATCH_SIZE = 200
 
 # Ensure the database directory exists before trying to use it
 os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 
 # --- Part 1: Your Tool Extraction Logic ---
-# (This function is still perfect and does not need to change)
-def extract_tool_data(directory: str):
+
+# "@param name (type): description" docstring lines -> (name, "(type): description")
+_PARAM_RE = re.compile(r'^[ \t]*@param[ \t]+(\S+)[ \t]*(.*)$', re.MULTILINE)
+
+# A simple mapping from Python types to JSON Schema types
+_TYPE_MAP = {
+    "str": "string",
+    "int": "integer",
+    "float": "number",
+    "bool": "boolean",
+    "list": "array",
+    "dict": "object",
+}
+
+def _process_tool_file(abs_directory: str, module_parent_dir: str, filename: str) -> list:
+    """
+    Imports one tool module and returns the tool data for each of its public functions.
+    Runs in a worker process, so it must stay a top-level function.
+    """
+    # Worker processes don't inherit the parent's sys.path changes under the spawn start method.
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
+    tools_data = []
+    module_name = filename[:-3]
+    # Adjust module path logic to handle nested directories if necessary
+    module_path_for_import = f"{module_parent_dir}.{module_name}"
+
+    try:
+        # Taken before the import, so an edit made while inspecting is picked up by the next sync.
+        mtime_ns = os.stat(os.path.join(abs_directory, filename)).st_mtime_ns
+        spec = importlib.util.find_spec(module_path_for_import)
+        if not spec or not spec.loader: return tools_data
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        for name, func in inspect.getmembers(module, inspect.isfunction):
+            if not name.startswith('_') and func.__module__ == module.__name__:
+                
+                full_docstring = inspect.getdoc(func) or "No description provided."
+                main_description = full_docstring.split('\n', 1)[0] # The first line is the main description
+                
+                # --- JSON Schema Generation ---
+                properties = {}
+                required = []
+                schema = {
+                    "type": "function",
+                    "function": {
+                        "name": name,
+                        "description": main_description,
+                        "parameters": {
+                            "type": "object",
+                            "properties": properties,
+                            "required": required,
+                        }
+                    }
+                }
+
+                # --- Parameter Inspection ---
+                sig = inspect.signature(func)
+                param_docs = dict(_PARAM_RE.findall(full_docstring))
+
+                for param_name, param in sig.parameters.items():
+                    param_type = "string" # Default to string
+                    if param.annotation is not inspect.Parameter.empty and hasattr(param.annotation, '__name__'):
+                        param_type = _TYPE_MAP.get(param.annotation.__name__.lower(), "string")
+
+                    properties[param_name] = {
+                        "type": param_type,
+                        "description": param_docs.get(param_name, "") # Get param description from docstring
+                    }
+
+                    # Check if the parameter is required (i.e., has no default value)
+                    if param.default is inspect.Parameter.empty:
+                        required.append(param_name)
+
+                tool_info = {
+                    "id": name,
+                    "description": full_docstring, # We embed the full docstring for richer context
+                    "spec": json.dumps(schema, separators=(',', ':')),
+                    "source_file": filename,
+                    "mtime_ns": mtime_ns,
+                }
+                tools_data.append(tool_info)
+
+    except Exception as e:
+        print(f"Error processing {module_path_for_import}: {e}")
+
+    return tools_data
+
+
+def _scan_tool_files(abs_directory: str) -> dict:
+    """Maps each tool module filename in abs_directory to its modification time in nanoseconds."""
+    # We add the proxy tool exclusion here
+    with os.scandir(abs_directory) as entries:
+        return {entry.name: entry.stat().st_mtime_ns for entry in entries
+                if entry.name.endswith('.py') and not entry.name.startswith('__') and entry.name not in _EXCLUDED
+                and entry.is_file()}
+
+
+def extract_tool_data(directory: str, filenames: list = None):
     """
     Scans a directory for Python files, inspects them for public functions,
     and extracts a detailed JSON Schema for each tool.
+    Each file is imported and inspected in a separate worker process.
+    If filenames is given, only those files in the directory are inspected.
     """
 
     if project_root not in sys.path:
         sys.path.insert(0, project_root)
 
-    all_tools_data = []
     abs_directory = os.path.abspath(directory)
     if not os.path.isdir(abs_directory):
         print(f"Error: Directory '{abs_directory}' not found.")
@@ -65,82 +178,47 @@ def extract_tool_data(directory: str):
     
     module_parent_dir = os.path.basename(abs_directory)
 
-    for filename in os.listdir(abs_directory):
-        # We add the proxy tool exclusion here
-        if filename.endswith('.py') and not filename.startswith('__') and filename != 'find_best_tool.py':
-            module_name = filename[:-3]
-            # Adjust module path logic to handle nested directories if necessary
-            module_path_for_import = f"{module_parent_dir}.{module_name}"
-            
-            try:
-                spec = importlib.util.find_spec(module_path_for_import)
-                if not spec or not spec.loader: continue
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-
-                for name, func in inspect.getmembers(module, inspect.isfunction):
-                    if not name.startswith('_') and func.__module__ == module.__name__:
-                        
-                        full_docstring = inspect.getdoc(func) or "No description provided."
-                        main_description = full_docstring.split('\n')[0] # The first line is the main description
-                        
-                        # --- JSON Schema Generation ---
-                        schema = {
-                            "type": "function",
-                            "function": {
-                                "name": name,
-                                "description": main_description,
-                                "parameters": {
-                                    "type": "object",
-                                    "properties": {},
-                                    "required": [],
-                                }
-                            }
-                        }
-
-                        # --- Parameter Inspection ---
-                        sig = inspect.signature(func)
-                        param_docs = {line.split(' ')[1]: " ".join(line.split(' ')[2:]) for line in full_docstring.split('\n') if line.strip().startswith('@param')}
-
-                        for param in sig.parameters.values():
-                            param_name = param.name
-                            param_type = "string" # Default to string
-                            if param.annotation is not inspect.Parameter.empty and hasattr(param.annotation, '__name__'):
-                                # A simple mapping from Python types to JSON Schema types
-                                type_map = {
-                                    "str": "string",
-                                    "int": "integer",
-                                    "float": "number",
-                                    "bool": "boolean",
-                                    "list": "array",
-                                    "dict": "object",
-                                }
-                                param_type = type_map.get(param.annotation.__name__.lower(), "string")
-
-                            schema["function"]["parameters"]["properties"][param_name] = {
-                                "type": param_type,
-                                "description": param_docs.get(param_name, "") # Get param description from docstring
-                            }
-
-                            # Check if the parameter is required (i.e., has no default value)
-                            if param.default is inspect.Parameter.empty:
-                                schema["function"]["parameters"]["required"].append(param_name)
-
-                        tool_info = {
-                            "id": name,
-                            "description": full_docstring, # We embed the full docstring for richer context
-                            "spec": json.dumps(schema, indent=2)
-                        }
-                        all_tools_data.append(tool_info)
+    py_files = list(_scan_tool_files(abs_directory)) if filenames is None else list(filenames)
+    if not py_files:
+        return []
 
-            except Exception as e:
-                print(f"Error processing {module_path_for_import}: {e}")
+    all_tools_data = []
+    with ProcessPoolExecutor(max_workers=min(len(py_files), os.cpu_count() or 1)) as executor:
+        for tools_data in executor.map(partial(_process_tool_file, abs_directory, module_parent_dir), py_files):
+            all_tools_data.extend(tools_data)
 
     return all_tools_data
 
 
 # --- Part 2: Main Database Indexing Logic with ChromaDB ---
 
+def _embed_documents(ollama_client, documents: list) -> list:
+    """
+    Embeds all documents with a single batched /api/embed call. Falls back to concurrent
+    per-document /api/embeddings calls if the client or server lacks batch support.
+    Embeddings are returned in the same order as documents.
+    """
+    try:
+        embeddings = list(ollama_client.embed(model=MODEL_NAME, input=documents)['embeddings'])
+        if len(embeddings) == len(documents):
+            return embeddings
+        print(f"    - Batch embedding returned {len(embeddings)} vectors for {len(documents)} documents; retrying individually...")
+    except (AttributeError, ollama.ResponseError) as e:
+        print(f"    - Batch embedding unavailable ({e}); embedding documents individually...")
+
+    with ThreadPoolExecutor(max_workers=EMBED_WORKERS) as executor:
+        return list(executor.map(
+            lambda doc: ollama_client.embeddings(model=MODEL_NAME, prompt=doc)['embedding'],
+            documents,
+        ))
+
+
+def _tool_metadata(tool_data: dict) -> dict:
+    return {"spec": tool_data['spec'], "fingerprint": tool_data['fingerprint'],
+            "doc_fingerprint": tool_data['doc_fingerprint'],
+            "source_file": tool_data['source_file'], "mtime_ns": tool_data['mtime_ns']}
+
+
 def main():
     """
     Performs a smart synchronization between tool files on disk and the ChromaDB database.
@@ -156,35 +234,63 @@ def main():
         metadata={"hnsw:space": "cosine"}
     )
     
-    # 2. Get the current state of tools on disk
-    print(f"\n[2/5] Scanning for tools in '{TOOLS_DIRECTORY}' directory...")
-    disk_tools = {tool['id']: tool for tool in extract_tool_data(TOOLS_DIRECTORY)}
-    print(f"Found {len(disk_tools)} tools on disk.")
-
-    # 3. Get the current state of tools in the database
-    print("\n[3/5] Fetching existing tool fingerprints from database...")
+    # 2. Get the current state of tools in the database
+    print("\n[2/5] Fetching existing tool fingerprints from database...")
     db_tools = collection.get(include=["metadatas"])
-    db_tool_fingerprints = {db_id: db_meta.get('fingerprint') for db_id, db_meta in zip(db_tools['ids'], db_tools['metadatas'])}
-    print(f"Found {len(db_tool_fingerprints)} tools in the database.")
+    db_metadatas = {db_id: db_meta or {} for db_id, db_meta in zip(db_tools['ids'], db_tools['metadatas'])}
+    print(f"Found {len(db_metadatas)} tools in the database.")
+
+    # 3. Get the current state of tools on disk
+    # Files whose mtime matches the one recorded for all of their tools are not re-imported;
+    # their tools are kept as they are. Everything else goes through extract_tool_data.
+    print(f"\n[3/5] Scanning for tools in '{TOOLS_DIRECTORY}' directory...")
+    abs_tools_directory = os.path.abspath(TOOLS_DIRECTORY)
+    if os.path.isdir(abs_tools_directory):
+        disk_files = _scan_tool_files(abs_tools_directory)
+    else:
+        print(f"Error: Directory '{abs_tools_directory}' not found.")
+        disk_files = {}
+
+    db_tools_by_file = {}
+    for db_id, db_meta in db_metadatas.items():
+        db_tools_by_file.setdefault(db_meta.get('source_file'), []).append((db_id, db_meta.get('mtime_ns')))
+    unchanged_files = {filename for filename, file_tools in db_tools_by_file.items()
+                       if filename in disk_files and all(mtime_ns == disk_files[filename] for _, mtime_ns in file_tools)}
+    changed_files = [filename for filename in disk_files if filename not in unchanged_files]
+    unchanged_ids = {db_id for filename in unchanged_files for db_id, _ in db_tools_by_file[filename]}
+
+    disk_tools = {tool['id']: tool for tool in extract_tool_data(abs_tools_directory, changed_files)} if changed_files else {}
+    print(f"Found {len(disk_files)} tool files: {len(unchanged_files)} unchanged, {len(changed_files)} inspected ({len(disk_tools)} tools).")
 
     # 4. Determine what has changed
     print("\n[4/5] Comparing disk tools to database to find changes...")
     tools_to_upsert = []
+    tools_to_touch = []
     
     for tool_id, tool_data in disk_tools.items():
-        # Create a fingerprint from the parts that define the tool's behavior and schema
-        content_to_hash = tool_data['description'] + tool_data['spec']
-        current_fingerprint = hashlib.sha256(content_to_hash.encode()).hexdigest()
+        # Create a fingerprint from the parts that define the tool's behavior and schema.
+        # Fed piece by piece: same digest as hashing description + spec, without the joined copy.
+        hasher = hashlib.sha256(tool_data['description'].encode())
+        # The embedding depends on the description alone, so it gets its own fingerprint.
+        tool_data['doc_fingerprint'] = hasher.hexdigest()
+        hasher.update(tool_data['spec'].encode())
+        current_fingerprint = hasher.hexdigest()
+        tool_data['fingerprint'] = current_fingerprint # Add the new fingerprint
+        db_meta = db_metadatas.get(tool_id, {})
         
         # If tool is new or has changed, add it to the list for upserting
-        if db_tool_fingerprints.get(tool_id) != current_fingerprint:
+        if db_meta.get('fingerprint') != current_fingerprint:
             print(f"  - Change detected for '{tool_id}'. Queued for update/insertion.")
-            tool_data['fingerprint'] = current_fingerprint # Add the new fingerprint
             tools_to_upsert.append(tool_data)
+        # Same content, but the file was touched (or synced before mtimes were recorded):
+        # refresh the metadata so the file is skipped next time, without re-embedding.
+        elif ((db_meta.get('doc_fingerprint'), db_meta.get('source_file'), db_meta.get('mtime_ns'))
+              != (tool_data['doc_fingerprint'], tool_data['source_file'], tool_data['mtime_ns'])):
+            tools_to_touch.append(tool_data)
 
     # Determine which tools were deleted
-    ids_on_disk = set(disk_tools.keys())
-    ids_in_db = set(db_tool_fingerprints.keys())
+    ids_on_disk = set(disk_tools.keys()) | unchanged_ids
+    ids_in_db = set(db_metadatas.keys())
     ids_to_delete = list(ids_in_db - ids_on_disk)
 
     # 5. Execute database operations
@@ -194,23 +300,46 @@ def main():
         # Prepare data for batch upsert
         ids = [t['id'] for t in tools_to_upsert]
         documents = [t['description'] for t in tools_to_upsert]
-        metadatas = [{"spec": t['spec'], "fingerprint": t['fingerprint']} for t in tools_to_upsert]
+        metadatas = [_tool_metadata(t) for t in tools_to_upsert]
         
         # --- THIS IS THE CORRECTED EMBEDDING LOGIC ---
-        print("    - Generating embeddings with Ollama (this may take a moment)...")
-        ollama_client = ollama.Client()
-        embeddings = []
-        for doc in documents:
-            # Call the embedding function once per document
-            response = ollama_client.embeddings(model=MODEL_NAME, prompt=doc)
-            embeddings.append(response['embedding'])
-        print("    - Embeddings generated.")
+        # Tools whose description is unchanged (e.g. only the signature changed) keep their stored
+        # embedding; only the rest are sent to Ollama.
+        reuse_ids = [t['id'] for t in tools_to_upsert
+                     if db_metadatas.get(t['id'], {}).get('doc_fingerprint') == t['doc_fingerprint']]
+        stored_embeddings = {}
+        if reuse_ids:
+            stored = collection.get(ids=reuse_ids, include=["embeddings"])
+            stored_vectors = stored.get('embeddings')
+            if stored_vectors is not None:
+                stored_embeddings = {db_id: vector for db_id, vector in zip(stored['ids'], stored_vectors) if vector is not None}
+            print(f"    - Reusing stored embeddings for {len(stored_embeddings)} tools with unchanged descriptions.")
+
+        embeddings = [stored_embeddings.get(tool_id) for tool_id in ids]
+        to_embed = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if to_embed:
+            print(f"    - Generating embeddings for {len(to_embed)} tools with Ollama (this may take a moment)...")
+            ollama_client = ollama.Client()
+            for i, embedding in zip(to_embed, _embed_documents(ollama_client, [documents[i] for i in to_embed])):
+                embeddings[i] = embedding
+            print("    - Embeddings generated.")
+        # One contiguous float32 matrix, which is what Chroma stores, instead of a list of float lists.
+        embeddings = np.asarray(embeddings, dtype=np.float32)
         
-        collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+        for start in range(0, len(ids), UPSERT_BATCH_SIZE):
+            end = start + UPSERT_BATCH_SIZE
+            collection.upsert(ids=ids[start:end], documents=documents[start:end],
+                              metadatas=metadatas[start:end], embeddings=embeddings[start:end])
         print("  - Upsert complete.")
     else:
         print("  - No tools needed to be added or updated.")
 
+    if tools_to_touch:
+        print(f"  - Recording new modification times for {len(tools_to_touch)} unchanged tools...")
+        for start in range(0, len(tools_to_touch), UPSERT_BATCH_SIZE):
+            batch = tools_to_touch[start:start + UPSERT_BATCH_SIZE]
+            collection.update(ids=[t['id'] for t in batch], metadatas=[_tool_metadata(t) for t in batch])
+
     if ids_to_delete:
         print(f"  - Deleting {len(ids_to_delete)} tools removed from disk: {ids_to_delete}")
         collection.delete(ids=ids_to_delete)
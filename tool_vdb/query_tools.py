@@ -5,6 +5,7 @@ import json
 import sys
 import os
 import configparser
+from functools import lru_cache
 
 # --- Configuration ---
 
@@ -43,6 +44,19 @@ MODEL_NAME = config['Models']['EMBEDDING_MODEL']
 # Ensure the database directory exists before trying to use it
 os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 
+# --- Cached Clients ---
+# Opening the persistent client loads the SQLite store and HNSW index, so the handles are created
+# on first use and shared by every later query. Failures aren't cached; the next call retries.
+
+@lru_cache(maxsize=1)
+def _get_collection():
+    client = chromadb.PersistentClient(path=DB_PATH)
+    return client.get_collection(name=COLLECTION_NAME)
+
+@lru_cache(maxsize=1)
+def _get_ollama():
+    return ollama.Client()
+
 # --- Main Function ---
 
 
@@ -55,13 +69,12 @@ def find_similar_tools(query_text: str, n_results: int = 3) -> list:
     @param n_results (integer): The number of top tools to return. Defaults to 3.
     """
     try:
-        # 1. Setup ChromaDB client and get collection
-        client = chromadb.PersistentClient(path=DB_PATH)
-        collection = client.get_collection(name=COLLECTION_NAME)
+        # 1. Get the (cached) ChromaDB collection
+        collection = _get_collection()
 
         # 2. Health Check and Embedding Generation
         try:
-            ollama_client = ollama.Client()
+            ollama_client = _get_ollama()
             query_embedding = ollama_client.embeddings(
                 model=MODEL_NAME,
                 prompt=query_text
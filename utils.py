@@ -1,25 +1,49 @@
 import datetime
-import markdown
-import bleach
-from markdown.extensions.codehilite import CodeHiliteExtension
-from pymdownx import highlight, superfences, emoji
+import html
+import threading
+from functools import lru_cache
 import requests
+
+# markdown/bleach and the pymdownx extensions (which pull in Pygments) are imported on first
+# render, not by everything that imports utils (chat_instance only needs the audio helper).
+_MARKDOWN_EXTENSIONS = ['markdown.extensions.extra', 'markdown.extensions.tables', 'markdown.extensions.smarty', 'markdown.extensions.nl2br', 'pymdownx.superfences', 'pymdownx.highlight']
+_MARKDOWN_EXTENSION_CONFIGS = {'pymdownx.highlight': {'css_class': 'codehilite', 'guess_lang': True, 'use_pygments': True}}
+_ALLOWED_TAGS = frozenset({'p', 'pre', 'code', 'span', 'div', 'table', 'thead', 'tbody', 'tr', 'th', 'td', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'br', 'hr', 'img', 'strong', 'em', 'blockquote', 'del', 'ins', 'sub', 'sup', 'a', 'figure', 'figcaption', 'mark', 'small'})
+_ALLOWED_ATTRS = {'span': ['class'], 'div': ['class'], 'code': ['class'], 'pre': [], 'img': ['src', 'alt', 'title'], 'a': ['href', 'title'], '*': ['id']}
+
+# Markdown and bleach's Cleaner both keep per-document parser state, so each waitress thread
+# builds its own once and reuses it (the Markdown instance is reset per call).
+_thread_local = threading.local()
+
+def _get_markdown():
+    md = getattr(_thread_local, 'md', None)
+    if md is None:
+        import markdown
+        md = _thread_local.md = markdown.Markdown(extensions=_MARKDOWN_EXTENSIONS, extension_configs=_MARKDOWN_EXTENSION_CONFIGS, output_format='html5')
+    return md
+
+def _get_cleaner():
+    cleaner = getattr(_thread_local, 'cleaner', None)
+    if cleaner is None:
+        from bleach.sanitizer import Cleaner
+        cleaner = _thread_local.cleaner = Cleaner(tags=_ALLOWED_TAGS, attributes=_ALLOWED_ATTRS, strip=False, filters=[])
+    return cleaner
+
 def markdown_to_html(md_text):
     """Converts Markdown to HTML with full formatting support"""
     if not md_text:
         return ''
     try:
-        extensions = ['markdown.extensions.extra', 'markdown.extensions.tables', 'markdown.extensions.smarty', 'markdown.extensions.nl2br', 'pymdownx.superfences', 'pymdownx.highlight']
-        extension_configs = {'pymdownx.highlight': {'css_class': 'codehilite', 'guess_lang': True, 'use_pygments': True}}
-        html = markdown.markdown(md_text, extensions=extensions, extension_configs=extension_configs, output_format='html5')
-        allowed_tags = {'p', 'pre', 'code', 'span', 'div', 'table', 'thead', 'tbody', 'tr', 'th', 'td', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'br', 'hr', 'img', 'strong', 'em', 'blockquote', 'del', 'ins', 'sub', 'sup', 'a', 'figure', 'figcaption', 'mark', 'small'}
-        allowed_attrs = {'span': ['class'], 'div': ['class'], 'code': ['class'], 'pre': [], 'img': ['src', 'alt', 'title'], 'a': ['href', 'title'], '*': ['id']}
-        safe_html = bleach.clean(html, tags=allowed_tags, attributes=allowed_attrs, strip=False)
+        rendered = _get_markdown().reset().convert(md_text)
+        safe_html = _get_cleaner().clean(rendered)
         return safe_html
     except Exception as e:
         print(f'Markdown conversion error: {e}')
-        return f'<pre>{bleach.clean(str(md_text))}</pre>'
+        # Shown as plain text, so escaping everything is enough; no sanitizer parse needed.
+        return f'<pre>{html.escape(str(md_text), quote=False)}</pre>'
 
+# Pure over its input, and chat history re-renders the same timestamps on every refresh.
+@lru_cache(maxsize=4096)
 def format_timestamp(iso_timestamp_str):
     """Formats ISO timestamp string nicely."""
     if not iso_timestamp_str or iso_timestamp_str == 'Edited':